@@ -1,4 +1,5 @@
 """LangGraph definition for Agent 2 codegen pipeline."""
+from functools import lru_cache
 from typing import Literal
 from langgraph.graph import StateGraph, END
 from agent2_codegen.state import Agent2State
@@ -55,3 +56,14 @@ def create_graph() -> StateGraph:
     workflow.add_edge("package_output", END)
     
     return workflow.compile()
+
+
+@lru_cache(maxsize=1)
+def get_graph() -> StateGraph:
+    """
+    Return a shared compiled graph, built on first use.
+    
+    The compiled graph holds no per-run state (no checkpointer), so a single
+    instance can be invoked concurrently by multiple requests.
+    """
+    return create_graph()
@@ -2,6 +2,7 @@
 import json
 import os
 import stat
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List
 from datetime import datetime
@@ -20,7 +21,14 @@ def emit_progress(
     level: str = "info",
     data: Dict[str, Any] = None
 ) -> None:
-    """Emit a progress event to state."""
+    """
+    Emit a progress event to state.
+    
+    Events are only appended to ``state.progress_events`` (a bounded deque);
+    no I/O happens here.
+    Consumers (CLI output, API response) serialize the whole list once when
+    the pipeline finishes.
+    """
     event = {
         "ts": datetime.utcnow().isoformat() + "Z",
         "level": level,
@@ -31,31 +39,49 @@ def emit_progress(
     state.progress_events.append(event)
 
 
+# Files that should be executable (shell scripts)
+EXECUTABLE_FILES = {'.sh', 'setup.sh', 'run.sh'}
+
+
+def _write_file(full_path: Path, file_path: str, content: str) -> None:
+    """Write a single generated file (parent directory must exist)."""
+    full_path.write_text(content, encoding='utf-8')
+    
+    # Make shell scripts executable
+    if any(exec_file in file_path for exec_file in EXECUTABLE_FILES) or file_path.endswith('.sh'):
+        try:
+            current_permissions = full_path.stat().st_mode
+            full_path.chmod(current_permissions | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        except (OSError, AttributeError):
+            # If chmod fails (e.g., on Windows), that's okay
+            pass
+
+
 def write_generated_files(
     generated_files: Dict[str, str],
     output_dir: str,
     pipeline_id: str
 ) -> None:
-    """Write generated files to disk."""
+    """Write generated files to disk (in parallel, one thread per file up to 32)."""
     base_path = Path(output_dir) / pipeline_id
     base_path.mkdir(parents=True, exist_ok=True)
     
-    # Files that should be executable (shell scripts)
-    executable_files = {'.sh', 'setup.sh', 'run.sh'}
+    if not generated_files:
+        return
+    
+    full_paths = {file_path: base_path / file_path for file_path in generated_files}
+    
+    # Create directories up front so worker threads never race on mkdir
+    for directory in {full_path.parent for full_path in full_paths.values()}:
+        directory.mkdir(parents=True, exist_ok=True)
     
-    for file_path, content in generated_files.items():
-        full_path = base_path / file_path
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        full_path.write_text(content, encoding='utf-8')
-        
-        # Make shell scripts executable
-        if any(exec_file in file_path for exec_file in executable_files) or file_path.endswith('.sh'):
-            try:
-                current_permissions = full_path.stat().st_mode
-                full_path.chmod(current_permissions | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
-            except (OSError, AttributeError):
-                # If chmod fails (e.g., on Windows), that's okay
-                pass
+    with ThreadPoolExecutor(max_workers=min(32, len(generated_files))) as executor:
+        futures = [
+            executor.submit(_write_file, full_paths[file_path], file_path, content)
+            for file_path, content in generated_files.items()
+        ]
+        for future in futures:
+            future.result()  # Re-raise any write error
 
 
 def create_manifest(
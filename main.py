@@ -103,7 +103,7 @@ def main():
         logger.info("Starting code generation pipeline...")
         final_state_dict = graph.invoke(state)
         # LangGraph returns a dict, convert back to state object for easier access
-        final_state = Agent2State(**final_state_dict) if isinstance(final_state_dict, dict) else final_state_dict
+        final_state = Agent2State.from_dict(final_state_dict) if isinstance(final_state_dict, dict) else final_state_dict
         logger.info("✓ Code generation pipeline completed")
     except Exception as e:
         logger.error(f"❌ Error during codegen: {e}")
@@ -148,7 +148,7 @@ def main():
         "status": final_state.status,
         "manifest": final_state.manifest,
         "generated_files": final_state.generated_files,
-        "progress_events": final_state.progress_events
+        "progress_events": list(final_state.progress_events)
     }
     
     if final_state.errors:
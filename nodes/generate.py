@@ -3,8 +3,9 @@ import os
 import json
 import re
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from agent2_codegen.state import Agent2State
@@ -36,6 +37,265 @@ TEMPLATE_MAP = {
     "README.md": "readme.md.j2",
 }
 
+# Setup/run scripts shipped with every generated agent (no per-agent substitutions)
+_SETUP_SH = """#!/bin/bash
+# Setup script for generated agent
+# This script creates a virtual environment, installs dependencies, and provides commands to run the agent
+
+set -e  # Exit on error
+
+AGENT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+AGENT_NAME=$(basename "$AGENT_DIR")
+VENV_DIR="$AGENT_DIR/.venv"
+
+echo "=========================================="
+echo "Setting up agent: $AGENT_NAME"
+echo "=========================================="
+echo ""
+
+# Step 1: Create virtual environment
+echo "📦 Step 1: Creating virtual environment..."
+if [ -d "$VENV_DIR" ]; then
+    echo "   ⚠️  Virtual environment already exists at $VENV_DIR"
+    read -p "   Do you want to recreate it? (y/N): " -n 1 -r
+    echo
+    if [[ $REPLY =~ ^[Yy]$ ]]; then
+        echo "   Removing existing virtual environment..."
+        rm -rf "$VENV_DIR"
+    else
+        echo "   Using existing virtual environment"
+    fi
+fi
+
+if [ ! -d "$VENV_DIR" ]; then
+    echo "   Creating virtual environment at $VENV_DIR..."
+    python3 -m venv "$VENV_DIR"
+    echo "   ✅ Virtual environment created"
+else
+    echo "   ✅ Virtual environment exists"
+fi
+
+# Step 2: Activate virtual environment, upgrade pip and install requirements in a single pip run
+echo ""
+echo "📦 Step 2: Upgrading pip and installing requirements..."
+source "$VENV_DIR/bin/activate"
+if [ -f "$AGENT_DIR/requirements.txt" ]; then
+    python -m pip install --upgrade pip setuptools wheel -r "$AGENT_DIR/requirements.txt"
+else
+    echo "   ⚠️  requirements.txt not found, only upgrading pip..."
+    python -m pip install --upgrade pip setuptools wheel
+fi
+echo "   ✅ pip upgraded and requirements installed"
+
+# Step 3: Check for .env file
+echo ""
+echo "📋 Step 3: Checking environment configuration..."
+if [ -f "$AGENT_DIR/.env" ]; then
+    echo "   ✅ .env file found"
+else
+    echo "   ⚠️  .env file not found"
+    if [ -f "$AGENT_DIR/.env.example" ]; then
+        echo "   💡 Copy .env.example to .env and configure it:"
+        echo "      cp $AGENT_DIR/.env.example $AGENT_DIR/.env"
+        echo "      # Then edit .env with your credentials"
+    fi
+fi
+
+echo ""
+echo "=========================================="
+echo "✅ Setup complete!"
+echo "=========================================="
+echo ""
+echo "To activate the virtual environment, run:"
+echo "  source $VENV_DIR/bin/activate"
+echo ""
+echo "To run the agent with ADK:"
+echo "  cd $AGENT_DIR/.."
+echo "  adk run $AGENT_NAME"
+echo ""
+echo "Or use the virtual environment Python:"
+echo "  source $VENV_DIR/bin/activate"
+echo "  cd $AGENT_DIR"
+echo "  python -c 'from agent import get_agent; agent = get_agent(); print(f\"Agent {agent.name} ready!\")'"
+echo ""
+"""
+
+_SETUP_PY = """#!/usr/bin/env python3
+\"\"\"
+Setup script for generated agent.
+This script creates a virtual environment, installs dependencies, and provides commands to run the agent.
+\"\"\"
+import os
+import sys
+import subprocess
+import shutil
+from pathlib import Path
+
+def run_command(cmd, check=True, shell=False):
+    \"\"\"Run a shell command and return the result.\"\"\"
+    print(f"   Running: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
+    try:
+        if isinstance(cmd, str):
+            result = subprocess.run(cmd, shell=True, check=check, capture_output=True, text=True)
+        else:
+            result = subprocess.run(cmd, check=check, capture_output=True, text=True)
+        if result.stdout:
+            print(result.stdout)
+        return result.returncode == 0
+    except subprocess.CalledProcessError as e:
+        if e.stdout:
+            print(e.stdout)
+        if e.stderr:
+            print(e.stderr, file=sys.stderr)
+        if check:
+            raise
+        return False
+
+def main():
+    \"\"\"Main setup function.\"\"\"
+    agent_dir = Path(__file__).parent.resolve()
+    agent_name = agent_dir.name
+    venv_dir = agent_dir / ".venv"
+    
+    print("=" * 50)
+    print(f"Setting up agent: {agent_name}")
+    print("=" * 50)
+    print()
+    
+    # Step 1: Create virtual environment
+    print("📦 Step 1: Creating virtual environment...")
+    if venv_dir.exists():
+        print(f"   ⚠️  Virtual environment already exists at {venv_dir}")
+        response = input("   Do you want to recreate it? (y/N): ").strip().lower()
+        if response == 'y':
+            print("   Removing existing virtual environment...")
+            shutil.rmtree(venv_dir)
+        else:
+            print("   Using existing virtual environment")
+    
+    if not venv_dir.exists():
+        print(f"   Creating virtual environment at {venv_dir}...")
+        run_command([sys.executable, "-m", "venv", str(venv_dir)])
+        print("   ✅ Virtual environment created")
+    else:
+        print("   ✅ Virtual environment exists")
+    
+    # Determine the correct Python path based on OS
+    if sys.platform == "win32":
+        python_exe = venv_dir / "Scripts" / "python.exe"
+        activate_script = venv_dir / "Scripts" / "activate.bat"
+    else:
+        python_exe = venv_dir / "bin" / "python"
+        activate_script = venv_dir / "bin" / "activate"
+    
+    # Step 2: Upgrade pip and install requirements in a single pip run
+    print()
+    print("📦 Step 2: Upgrading pip and installing requirements...")
+    pip_cmd = [str(python_exe), "-m", "pip", "install", "--upgrade", "pip", "setuptools", "wheel"]
+    requirements_file = agent_dir / "requirements.txt"
+    if requirements_file.exists():
+        pip_cmd += ["-r", str(requirements_file)]
+    else:
+        print("   ⚠️  requirements.txt not found, only upgrading pip...")
+    run_command(pip_cmd)
+    print("   ✅ pip upgraded and requirements installed")
+    
+    # Step 3: Check for .env file
+    print()
+    print("📋 Step 3: Checking environment configuration...")
+    env_file = agent_dir / ".env"
+    env_example = agent_dir / ".env.example"
+    
+    if env_file.exists():
+        print("   ✅ .env file found")
+    else:
+        print("   ⚠️  .env file not found")
+        if env_example.exists():
+            print("   💡 Copy .env.example to .env and configure it:")
+            print(f"      {'copy' if sys.platform == 'win32' else 'cp'} {env_example} {env_file}")
+            print("      # Then edit .env with your credentials")
+    
+    print()
+    print("=" * 50)
+    print("✅ Setup complete!")
+    print("=" * 50)
+    print()
+    
+    # Print instructions
+    if sys.platform == "win32":
+        print("To activate the virtual environment, run:")
+        print(f"  {activate_script}")
+    else:
+        print("To activate the virtual environment, run:")
+        print(f"  source {activate_script}")
+    
+    print()
+    print("To run the agent with ADK:")
+    print(f"  cd {agent_dir.parent}")
+    print(f"  adk run {agent_name}")
+    print()
+    print("Or use the virtual environment Python:")
+    if sys.platform == "win32":
+        print(f"  {activate_script}")
+    else:
+        print(f"  source {activate_script}")
+    print(f"  cd {agent_dir}")
+    print("  python -c \\\"from agent import get_agent; agent = get_agent(); print(f'Agent {agent.name} ready!')\\\"")
+    print()
+
+if __name__ == "__main__":
+    main()
+"""
+
+_RUN_SH = """#!/bin/bash
+# Quick run script for the agent
+# This script activates the venv and runs the agent
+
+set -e
+
+AGENT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+VENV_DIR="$AGENT_DIR/.venv"
+
+# Check if virtual environment exists
+if [ ! -d "$VENV_DIR" ]; then
+    echo "❌ Virtual environment not found!"
+    echo "   Run ./setup.sh first to create it"
+    exit 1
+fi
+
+# Activate virtual environment
+source "$VENV_DIR/bin/activate"
+
+# Check if .env exists
+if [ ! -f "$AGENT_DIR/.env" ]; then
+    echo "⚠️  Warning: .env file not found"
+    echo "   The agent may not work without proper configuration"
+    echo ""
+fi
+
+# Run the agent
+echo "🚀 Running agent..."
+echo ""
+cd "$AGENT_DIR"
+
+# Try to run with ADK if available
+if command -v adk &> /dev/null; then
+    AGENT_NAME=$(basename "$AGENT_DIR")
+    cd "$AGENT_DIR/.."
+    echo "Using ADK to run agent: $AGENT_NAME"
+    adk run "$AGENT_NAME"
+else
+    echo "ADK not found. Running agent directly with Python..."
+    python -c "
+from agent import get_agent
+agent = get_agent()
+print(f'✅ Agent \\\"{agent.name}\\\" loaded successfully!')
+print(f'   Model: {agent.model}')
+print(f'   Tools: {len(agent.tools) if hasattr(agent, \\\"tools\\\") else 0}')
+"
+fi
+"""
+
 
 def load_template(file_path: str) -> Optional[str]:
     """
@@ -65,7 +325,35 @@ def load_template(file_path: str) -> Optional[str]:
         return None
 
 
+# Environment variables that determine how the LLM client is built
+_LLM_ENV_VARS = (
+    "FORCE_API_KEY",
+    "GOOGLE_API_KEY",
+    "GEMINI_API_KEY",
+    "GOOGLE_CLOUD_PROJECT",
+    "GOOGLE_CLOUD_LOCATION",
+    "GOOGLE_APPLICATION_CREDENTIALS",
+)
+
+
 def get_llm() -> ChatGoogleGenerativeAI:
+    """
+    Return the shared Google Gemini LLM client.
+    
+    The client (and its underlying HTTP connection pool) is created once per
+    LLM configuration and reused for every file and every pipeline run, so
+    connection/TLS setup is not repeated for each request.
+    """
+    return _get_cached_llm(tuple(os.getenv(name) for name in _LLM_ENV_VARS))
+
+
+@lru_cache(maxsize=1)
+def _get_cached_llm(env_key: Tuple[Optional[str], ...]) -> ChatGoogleGenerativeAI:
+    """Create the LLM client for the given environment configuration."""
+    return _create_llm()
+
+
+def _create_llm() -> ChatGoogleGenerativeAI:
     """
     Initialize and return Google Gemini LLM using Vertex AI.
     
@@ -374,6 +662,7 @@ Requirements:
 - Include mcp>=0.1.0
 - Include pipedream>=1.0.0
 - Include python-dotenv>=1.0.0
+- Include pytest>=7.0 and pytest-xdist>=3.0 (the generated tests run in parallel)
 - Use the same format and comments as shown in the template
 
 Generate ONLY the requirements.txt content, no markdown formatting, no explanations.""",
@@ -525,6 +814,7 @@ def generate_files(state: Agent2State) -> Agent2State:
     logger.info("STEP 2: Initializing LLM for code generation")
     logger.info("-" * 60)
     try:
+        # Shared client: one instance (and connection pool) serves all files
         llm = get_llm()
         logger.info("✓ LLM ready for code generation")
     except ValueError as e:
@@ -588,278 +878,13 @@ def generate_files(state: Agent2State) -> Agent2State:
     logger.info("✓ Generated: config/__init__.py")
     
     # Generate setup scripts
-    agent_name = agent_spec.get("name", "GeneratedAgent").lower().replace(" ", "_")
-    
-    generated["setup.sh"] = f"""#!/bin/bash
-# Setup script for generated agent
-# This script creates a virtual environment, installs dependencies, and provides commands to run the agent
-
-set -e  # Exit on error
-
-AGENT_DIR="$(cd "$(dirname "${{BASH_SOURCE[0]}}")" && pwd)"
-AGENT_NAME=$(basename "$AGENT_DIR")
-VENV_DIR="$AGENT_DIR/.venv"
-
-echo "=========================================="
-echo "Setting up agent: $AGENT_NAME"
-echo "=========================================="
-echo ""
-
-# Step 1: Create virtual environment
-echo "📦 Step 1: Creating virtual environment..."
-if [ -d "$VENV_DIR" ]; then
-    echo "   ⚠️  Virtual environment already exists at $VENV_DIR"
-    read -p "   Do you want to recreate it? (y/N): " -n 1 -r
-    echo
-    if [[ $REPLY =~ ^[Yy]$ ]]; then
-        echo "   Removing existing virtual environment..."
-        rm -rf "$VENV_DIR"
-    else
-        echo "   Using existing virtual environment"
-    fi
-fi
-
-if [ ! -d "$VENV_DIR" ]; then
-    echo "   Creating virtual environment at $VENV_DIR..."
-    python3 -m venv "$VENV_DIR"
-    echo "   ✅ Virtual environment created"
-else
-    echo "   ✅ Virtual environment exists"
-fi
-
-# Step 2: Activate virtual environment and upgrade pip
-echo ""
-echo "📦 Step 2: Activating virtual environment and upgrading pip..."
-source "$VENV_DIR/bin/activate"
-pip install --upgrade pip setuptools wheel
-echo "   ✅ pip upgraded"
-
-# Step 3: Install requirements
-echo ""
-echo "📦 Step 3: Installing requirements..."
-if [ -f "$AGENT_DIR/requirements.txt" ]; then
-    pip install -r "$AGENT_DIR/requirements.txt"
-    echo "   ✅ Requirements installed"
-else
-    echo "   ⚠️  requirements.txt not found, skipping..."
-fi
-
-# Step 4: Check for .env file
-echo ""
-echo "📋 Step 4: Checking environment configuration..."
-if [ -f "$AGENT_DIR/.env" ]; then
-    echo "   ✅ .env file found"
-else
-    echo "   ⚠️  .env file not found"
-    if [ -f "$AGENT_DIR/.env.example" ]; then
-        echo "   💡 Copy .env.example to .env and configure it:"
-        echo "      cp $AGENT_DIR/.env.example $AGENT_DIR/.env"
-        echo "      # Then edit .env with your credentials"
-    fi
-fi
-
-echo ""
-echo "=========================================="
-echo "✅ Setup complete!"
-echo "=========================================="
-echo ""
-echo "To activate the virtual environment, run:"
-echo "  source $VENV_DIR/bin/activate"
-echo ""
-echo "To run the agent with ADK:"
-echo "  cd $AGENT_DIR/.."
-echo "  adk run $AGENT_NAME"
-echo ""
-echo "Or use the virtual environment Python:"
-echo "  source $VENV_DIR/bin/activate"
-echo "  cd $AGENT_DIR"
-echo "  python -c 'from agent import get_agent; agent = get_agent(); print(f\"Agent {{agent.name}} ready!\")'"
-echo ""
-"""
+    generated["setup.sh"] = _SETUP_SH
     logger.info("✓ Generated: setup.sh")
     
-    generated["setup.py"] = """#!/usr/bin/env python3
-\"\"\"
-Setup script for generated agent.
-This script creates a virtual environment, installs dependencies, and provides commands to run the agent.
-\"\"\"
-import os
-import sys
-import subprocess
-import shutil
-from pathlib import Path
-
-def run_command(cmd, check=True, shell=False):
-    \"\"\"Run a shell command and return the result.\"\"\"
-    print(f"   Running: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
-    try:
-        if isinstance(cmd, str):
-            result = subprocess.run(cmd, shell=True, check=check, capture_output=True, text=True)
-        else:
-            result = subprocess.run(cmd, check=check, capture_output=True, text=True)
-        if result.stdout:
-            print(result.stdout)
-        return result.returncode == 0
-    except subprocess.CalledProcessError as e:
-        if e.stdout:
-            print(e.stdout)
-        if e.stderr:
-            print(e.stderr, file=sys.stderr)
-        if check:
-            raise
-        return False
-
-def main():
-    \"\"\"Main setup function.\"\"\"
-    agent_dir = Path(__file__).parent.resolve()
-    agent_name = agent_dir.name
-    venv_dir = agent_dir / ".venv"
-    
-    print("=" * 50)
-    print(f"Setting up agent: {agent_name}")
-    print("=" * 50)
-    print()
-    
-    # Step 1: Create virtual environment
-    print("📦 Step 1: Creating virtual environment...")
-    if venv_dir.exists():
-        print(f"   ⚠️  Virtual environment already exists at {venv_dir}")
-        response = input("   Do you want to recreate it? (y/N): ").strip().lower()
-        if response == 'y':
-            print("   Removing existing virtual environment...")
-            shutil.rmtree(venv_dir)
-        else:
-            print("   Using existing virtual environment")
-    
-    if not venv_dir.exists():
-        print(f"   Creating virtual environment at {venv_dir}...")
-        run_command([sys.executable, "-m", "venv", str(venv_dir)])
-        print("   ✅ Virtual environment created")
-    else:
-        print("   ✅ Virtual environment exists")
-    
-    # Determine the correct Python and pip paths based on OS
-    if sys.platform == "win32":
-        python_exe = venv_dir / "Scripts" / "python.exe"
-        pip_exe = venv_dir / "Scripts" / "pip.exe"
-        activate_script = venv_dir / "Scripts" / "activate.bat"
-    else:
-        python_exe = venv_dir / "bin" / "python"
-        pip_exe = venv_dir / "bin" / "pip"
-        activate_script = venv_dir / "bin" / "activate"
-    
-    # Step 2: Upgrade pip
-    print()
-    print("📦 Step 2: Upgrading pip...")
-    run_command([str(pip_exe), "install", "--upgrade", "pip", "setuptools", "wheel"])
-    print("   ✅ pip upgraded")
-    
-    # Step 3: Install requirements
-    print()
-    print("📦 Step 3: Installing requirements...")
-    requirements_file = agent_dir / "requirements.txt"
-    if requirements_file.exists():
-        run_command([str(pip_exe), "install", "-r", str(requirements_file)])
-        print("   ✅ Requirements installed")
-    else:
-        print("   ⚠️  requirements.txt not found, skipping...")
-    
-    # Step 4: Check for .env file
-    print()
-    print("📋 Step 4: Checking environment configuration...")
-    env_file = agent_dir / ".env"
-    env_example = agent_dir / ".env.example"
-    
-    if env_file.exists():
-        print("   ✅ .env file found")
-    else:
-        print("   ⚠️  .env file not found")
-        if env_example.exists():
-            print("   💡 Copy .env.example to .env and configure it:")
-            print(f"      {'copy' if sys.platform == 'win32' else 'cp'} {env_example} {env_file}")
-            print("      # Then edit .env with your credentials")
-    
-    print()
-    print("=" * 50)
-    print("✅ Setup complete!")
-    print("=" * 50)
-    print()
-    
-    # Print instructions
-    if sys.platform == "win32":
-        print("To activate the virtual environment, run:")
-        print(f"  {activate_script}")
-    else:
-        print("To activate the virtual environment, run:")
-        print(f"  source {activate_script}")
-    
-    print()
-    print("To run the agent with ADK:")
-    print(f"  cd {agent_dir.parent}")
-    print(f"  adk run {agent_name}")
-    print()
-    print("Or use the virtual environment Python:")
-    if sys.platform == "win32":
-        print(f"  {activate_script}")
-    else:
-        print(f"  source {activate_script}")
-    print(f"  cd {agent_dir}")
-    print("  python -c \\\"from agent import get_agent; agent = get_agent(); print(f'Agent {agent.name} ready!')\\\"")
-    print()
-
-if __name__ == "__main__":
-    main()
-"""
+    generated["setup.py"] = _SETUP_PY
     logger.info("✓ Generated: setup.py")
     
-    generated["run.sh"] = """#!/bin/bash
-# Quick run script for the agent
-# This script activates the venv and runs the agent
-
-set -e
-
-AGENT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-VENV_DIR="$AGENT_DIR/.venv"
-
-# Check if virtual environment exists
-if [ ! -d "$VENV_DIR" ]; then
-    echo "❌ Virtual environment not found!"
-    echo "   Run ./setup.sh first to create it"
-    exit 1
-fi
-
-# Activate virtual environment
-source "$VENV_DIR/bin/activate"
-
-# Check if .env exists
-if [ ! -f "$AGENT_DIR/.env" ]; then
-    echo "⚠️  Warning: .env file not found"
-    echo "   The agent may not work without proper configuration"
-    echo ""
-fi
-
-# Run the agent
-echo "🚀 Running agent..."
-echo ""
-cd "$AGENT_DIR"
-
-# Try to run with ADK if available
-if command -v adk &> /dev/null; then
-    AGENT_NAME=$(basename "$AGENT_DIR")
-    cd "$AGENT_DIR/.."
-    echo "Using ADK to run agent: $AGENT_NAME"
-    adk run "$AGENT_NAME"
-else
-    echo "ADK not found. Running agent directly with Python..."
-    python -c "
-from agent import get_agent
-agent = get_agent()
-print(f'✅ Agent \\\"{agent.name}\\\" loaded successfully!')
-print(f'   Model: {agent.model}')
-print(f'   Tools: {len(agent.tools) if hasattr(agent, \\\"tools\\\") else 0}')
-"
-fi
-"""
+    generated["run.sh"] = _RUN_SH
     logger.info("✓ Generated: run.sh")
     
     # Step 4: Generate complex files with LLM
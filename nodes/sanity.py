@@ -1,11 +1,13 @@
 """Sanity checks node for Agent 2."""
 import re
 import ast
+import bisect
 import logging
 from pathlib import Path
 from typing import Dict, Any, List
 from agent2_codegen.state import Agent2State
 from agent2_codegen.io import emit_progress
+from agent2_codegen.utils.ast_cache import parse_py
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,19 @@ SECRET_PATTERNS = [
     r'access[_-]?token["\']?\s*[:=]\s*["\'][^"\']+["\']',
 ]
 
+# All secret patterns fused into one regex; the named group tells which pattern matched
+_SECRET_RE = re.compile(
+    "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(SECRET_PATTERNS)),
+    re.IGNORECASE
+)
+
+# Separator between files in the scanned corpus. The quote terminates any
+# match running off the end of a file before it reaches the next one.
+_CORPUS_SEP = "\n\0\"'\0\n"
+
+# Context near a match that marks it as a false positive
+_SECRET_SKIP_MARKERS = ('example', 'placeholder', 'comment', '#', '//')
+
 
 def validate_python_syntax(file_path: str, content: str) -> List[Dict[str, Any]]:
     """
@@ -38,7 +53,7 @@ def validate_python_syntax(file_path: str, content: str) -> List[Dict[str, Any]]
         return errors
     
     try:
-        ast.parse(content, filename=file_path)
+        parse_py(content)
     except SyntaxError as e:
         errors.append({
             "code": "SYNTAX_ERROR",
@@ -77,7 +92,7 @@ def validate_imports(file_path: str, content: str) -> List[Dict[str, Any]]:
         return errors
     
     try:
-        tree = ast.parse(content)
+        tree = parse_py(content)
         
         # Check for required imports based on file
         required_imports = {
@@ -129,7 +144,7 @@ def validate_structure(file_path: str, content: str) -> List[Dict[str, Any]]:
         return errors
     
     try:
-        tree = ast.parse(content)
+        tree = parse_py(content)
         
         # Check agent.py structure
         if file_path == "agent.py":
@@ -196,6 +211,57 @@ def validate_structure(file_path: str, content: str) -> List[Dict[str, Any]]:
     return errors
 
 
+def find_hardcoded_secrets(generated_files: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Scan all generated files for hardcoded secrets in a single regex pass.
+    
+    Files are joined into one corpus; each match is attributed back to its
+    file by bisecting the match offset against the file start offsets.
+    
+    Args:
+        generated_files: Dictionary mapping file paths to contents
+        
+    Returns:
+        List of errors, one per file and pattern with suspicious matches
+    """
+    paths = list(generated_files)
+    starts = []
+    offset = 0
+    for path in paths:
+        starts.append(offset)
+        offset += len(generated_files[path]) + len(_CORPUS_SEP)
+    corpus = _CORPUS_SEP.join(generated_files[path] for path in paths)
+    
+    # (file index, pattern index) -> suspicious matches, in file order
+    found: Dict[tuple, List[str]] = {}
+    for match in _SECRET_RE.finditer(corpus):
+        file_idx = bisect.bisect_right(starts, match.start()) - 1
+        file_start = starts[file_idx]
+        content = generated_files[paths[file_idx]]
+        if match.end() - file_start > len(content):
+            continue  # Ran into the separator: unterminated string at end of file
+        
+        # Filter out false positives (like in comments or error messages)
+        pos = match.start() - file_start
+        context = content[max(0, pos - 50):pos + 50].lower()
+        if any(skip in context for skip in _SECRET_SKIP_MARKERS):
+            continue
+        
+        pattern_idx = int(match.lastgroup[1:])
+        found.setdefault((file_idx, pattern_idx), []).append(match.group())
+    
+    errors = []
+    for (file_idx, pattern_idx), suspicious in sorted(found.items()):
+        file_path = paths[file_idx]
+        errors.append({
+            "code": "HARDCODED_SECRET",
+            "message": f"Potential hardcoded secret found in {file_path}",
+            "details": {"file": file_path, "pattern": SECRET_PATTERNS[pattern_idx], "matches": suspicious[:3]}
+        })
+    
+    return errors
+
+
 def sanity_checks(state: Agent2State) -> Agent2State:
     """Perform comprehensive sanity checks on generated files."""
     emit_progress(state, "RUNNING_SANITY_CHECKS", "Running sanity checks", "info")
@@ -225,22 +291,9 @@ def sanity_checks(state: Agent2State) -> Agent2State:
         # Structure validation
         structure_errors = validate_structure(file_path, content)
         errors.extend(structure_errors)
-        
-        # Check for hardcoded secrets
-        for pattern in SECRET_PATTERNS:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            if matches:
-                # Filter out false positives (like in comments or error messages)
-                suspicious = [m for m in matches if not any(
-                    skip in content[max(0, content.find(m)-50):content.find(m)+50].lower()
-                    for skip in ['example', 'placeholder', 'comment', '#', '//']
-                )]
-                if suspicious:
-                    errors.append({
-                        "code": "HARDCODED_SECRET",
-                        "message": f"Potential hardcoded secret found in {file_path}",
-                        "details": {"file": file_path, "pattern": pattern, "matches": suspicious[:3]}
-                    })
+    
+    # Check for hardcoded secrets (one pass over all files)
+    errors.extend(find_hardcoded_secrets(state.generated_files))
     
     # Check manifest files match generated files
     if state.manifest:
@@ -5,6 +5,13 @@ from agent2_codegen.io import emit_progress
 
 logger = logging.getLogger(__name__)
 
+# pytest config for the generated agent: run the independent import/structure
+# tests across all cores with pytest-xdist
+PYTEST_INI = "[pytest]\naddopts = -n auto\n"
+
+# Test dependencies appended to the generated requirements.txt
+TEST_REQUIREMENTS = ["pytest>=7.0", "pytest-xdist>=3.0"]
+
 
 def generate_test_file(state: Agent2State) -> str:
     """
@@ -183,6 +190,18 @@ def generate_tests(state: Agent2State) -> Agent2State:
     state.generated_files["test_agent.py"] = test_file_content
     logger.info("✓ Generated test_agent.py")
     
+    # Run the generated tests in parallel (pytest-xdist)
+    state.generated_files["pytest.ini"] = PYTEST_INI
+    logger.info("✓ Generated pytest.ini")
+    
+    requirements = state.generated_files.get("requirements.txt")
+    if requirements is not None:
+        missing = [req for req in TEST_REQUIREMENTS if req.split(">=")[0] not in requirements]
+        if missing:
+            state.generated_files["requirements.txt"] = (
+                requirements.rstrip("\n") + "\n\n# Testing\n" + "\n".join(missing) + "\n"
+            )
+    
     emit_progress(state, "GENERATING_TESTS", "Test file generated", "info")
     
     if state.errors:
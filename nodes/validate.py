@@ -1,13 +1,83 @@
 """Validation node for Agent 2."""
-from typing import Dict, Any
+import hashlib
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
+import orjson
+import fastjsonschema
+from cachetools import LRUCache
 from agent2_codegen.state import Agent2State
 from agent2_codegen.io import emit_progress
 
+# agent_spec JSON Schema, compiled once into a specialized validator function
+AGENT_SPEC_SCHEMA_PATH = Path(__file__).parent.parent / "schemas" / "agent_spec.json"
+_validate_spec_schema = fastjsonschema.compile(json.loads(AGENT_SPEC_SCHEMA_PATH.read_text(encoding="utf-8")))
+
+REQUIRED_SPEC_FIELDS = ["name", "description", "runtime", "tools_required", "actions"]
+
+# Validation results keyed by a hash of (agent_spec, tool_registry, integrations).
+# Validation is pure over those inputs, so retries of the same spec skip it.
+_validation_cache: LRUCache = LRUCache(maxsize=256)
+_validation_cache_lock = threading.Lock()
+
+# Shared read-only default for missing integration sections
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _inputs_key(state: Agent2State) -> Optional[bytes]:
+    """Hash the validation inputs; None if they are not JSON-serializable."""
+    try:
+        payload = orjson.dumps(
+            [state.agent_spec, state.tool_registry, state.integrations],
+            option=orjson.OPT_SORT_KEYS
+        )
+    except TypeError:
+        return None
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _validation_failed(state: Agent2State, errors: List[Dict[str, Any]]) -> Agent2State:
+    """Record validation errors on state (single exit path for all failures)."""
+    state.errors = errors
+    state.status = "error"
+    emit_progress(state, "VALIDATING_INPUT", f"Validation failed: {len(errors)} errors", "error", {"errors": len(errors)})
+    return state
+
 
 def validate_input(state: Agent2State) -> Agent2State:
     """Validate input payload and tool connections."""
     emit_progress(state, "VALIDATING_INPUT", "Starting input validation", "info")
     
+    key = _inputs_key(state)
+    with _validation_cache_lock:
+        errors = _validation_cache.get(key) if key is not None else None
+    if errors is None:
+        errors = collect_validation_errors(state)
+        if key is not None:
+            with _validation_cache_lock:
+                _validation_cache[key] = errors
+    
+    if errors:
+        # Copy: later nodes append to state.errors
+        return _validation_failed(state, list(errors))
+    
+    state.validation_passed = True
+    emit_progress(state, "VALIDATING_INPUT", "Validation passed", "info")
+    return state
+
+
+def collect_validation_errors(state: Agent2State) -> List[Dict[str, Any]]:
+    """
+    Check the input payload and tool connections.
+    
+    Args:
+        state: Pipeline state holding agent_spec, tool_registry and integrations
+        
+    Returns:
+        List of validation errors (empty if the input is valid)
+    """
     errors = []
     
     # Validate required top-level fields
@@ -33,78 +103,77 @@ def validate_input(state: Agent2State) -> Agent2State:
         })
     
     if errors:
-        state.errors = errors
-        state.status = "error"
-        emit_progress(state, "VALIDATING_INPUT", "Validation failed", "error", {"errors": len(errors)})
-        return state
+        return errors
     
-    # Validate agent_spec structure
+    # Validate agent_spec structure against the compiled schema
     agent_spec = state.agent_spec
-    required_spec_fields = ["name", "description", "runtime", "tools_required", "actions"]
-    for field in required_spec_fields:
-        if field not in agent_spec:
+    try:
+        _validate_spec_schema(agent_spec)
+    except fastjsonschema.JsonSchemaException as e:
+        # The schema stops at the first failure; report every missing field
+        for field in REQUIRED_SPEC_FIELDS:
+            if field not in agent_spec:
+                errors.append({
+                    "code": f"MISSING_FIELD_{field.upper()}",
+                    "message": f"agent_spec.{field} is required",
+                    "details": {"field": field}
+                })
+        if not errors:
             errors.append({
-                "code": f"MISSING_FIELD_{field.upper()}",
-                "message": f"agent_spec.{field} is required",
-                "details": {"field": field}
+                "code": "INVALID_AGENT_SPEC",
+                "message": e.message,
+                "details": {"path": e.name, "rule": e.rule}
             })
+        # Cross-reference checks below need a structurally valid spec
+        return errors
+    
+    # Lookup tables for the per-tool / per-action checks below
+    registry_slugs = state.tool_registry_by_slug.keys()
+    spec_slugs = frozenset(tool.get("tool_slug") for tool in agent_spec["tools_required"])
+    pipedream_ids = state.integrations.get("pipedream", _EMPTY).get("external_user_ids", _EMPTY)
     
     # Validate tools_required
-    if "tools_required" in agent_spec:
-        tool_slugs_in_spec = {tool.get("tool_slug") for tool in agent_spec["tools_required"]}
-        tool_slugs_in_registry = {tool.get("tool_slug") for tool in state.tool_registry}
+    for tool_spec in agent_spec["tools_required"]:
+        tool_slug = tool_spec.get("tool_slug")
+        if not tool_slug:
+            errors.append({
+                "code": "MISSING_TOOL_SLUG",
+                "message": "tools_required entry missing tool_slug",
+                "details": {"tool_spec": tool_spec}
+            })
+            continue
         
-        for tool_spec in agent_spec["tools_required"]:
-            tool_slug = tool_spec.get("tool_slug")
-            if not tool_slug:
-                errors.append({
-                    "code": "MISSING_TOOL_SLUG",
-                    "message": "tools_required entry missing tool_slug",
-                    "details": {"tool_spec": tool_spec}
-                })
-                continue
-            
-            # Check tool exists in registry
-            if tool_slug not in tool_slugs_in_registry:
+        # Check tool exists in registry
+        if tool_slug not in registry_slugs:
+            errors.append({
+                "code": "TOOL_NOT_IN_REGISTRY",
+                "message": f"Tool '{tool_slug}' not found in tool_registry",
+                "details": {"tool_slug": tool_slug}
+            })
+        
+        # Check Pipedream connection if auth_required
+        if tool_spec.get("provider") == "pipedream" and tool_spec.get("auth_required"):
+            if tool_slug not in pipedream_ids:
                 errors.append({
-                    "code": "TOOL_NOT_IN_REGISTRY",
-                    "message": f"Tool '{tool_slug}' not found in tool_registry",
+                    "code": "MISSING_PIPEDREAM_CONNECTION",
+                    "message": f"Tool '{tool_slug}' requires Pipedream connection but external_user_id not found",
                     "details": {"tool_slug": tool_slug}
                 })
-            
-            # Check Pipedream connection if auth_required
-            if tool_spec.get("provider") == "pipedream" and tool_spec.get("auth_required"):
-                pipedream_ids = state.integrations.get("pipedream", {}).get("external_user_ids", {})
-                if tool_slug not in pipedream_ids:
-                    errors.append({
-                        "code": "MISSING_PIPEDREAM_CONNECTION",
-                        "message": f"Tool '{tool_slug}' requires Pipedream connection but external_user_id not found",
-                        "details": {"tool_slug": tool_slug}
-                    })
     
     # Validate actions reference valid tools
-    if "actions" in agent_spec:
-        for action in agent_spec["actions"]:
-            action_tool_slug = action.get("tool_slug")
-            if not action_tool_slug:
-                errors.append({
-                    "code": "MISSING_ACTION_TOOL_SLUG",
-                    "message": "Action missing tool_slug",
-                    "details": {"action": action}
-                })
-            elif action_tool_slug not in tool_slugs_in_spec:
-                errors.append({
-                    "code": "ACTION_TOOL_NOT_IN_SPEC",
-                    "message": f"Action references tool '{action_tool_slug}' not in tools_required",
-                    "details": {"action": action.get("name"), "tool_slug": action_tool_slug}
-                })
-    
-    if errors:
-        state.errors = errors
-        state.status = "error"
-        emit_progress(state, "VALIDATING_INPUT", f"Validation failed: {len(errors)} errors", "error")
-    else:
-        state.validation_passed = True
-        emit_progress(state, "VALIDATING_INPUT", "Validation passed", "info")
+    for action in agent_spec["actions"]:
+        action_tool_slug = action.get("tool_slug")
+        if not action_tool_slug:
+            errors.append({
+                "code": "MISSING_ACTION_TOOL_SLUG",
+                "message": "Action missing tool_slug",
+                "details": {"action": action}
+            })
+        elif action_tool_slug not in spec_slugs:
+            errors.append({
+                "code": "ACTION_TOOL_NOT_IN_SPEC",
+                "message": f"Action references tool '{action_tool_slug}' not in tools_required",
+                "details": {"action": action.get("name"), "tool_slug": action_tool_slug}
+            })
     
-    return state
+    return errors
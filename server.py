@@ -4,15 +4,21 @@ API Server for Agent 2 Code Generator.
 Run with: uvicorn server:app --reload --port 8000
 Or: python server.py
 """
+import asyncio
+import heapq
 import json
 import logging
 import os
 import sys
+import threading
+import time
+from functools import lru_cache
+from itertools import count, islice
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Body
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
@@ -22,7 +28,7 @@ parent_dir = Path(__file__).parent.parent
 if str(parent_dir) not in sys.path:
     sys.path.insert(0, str(parent_dir))
 
-from agent2_codegen.graph import create_graph
+from agent2_codegen.graph import get_graph
 from agent2_codegen.state import Agent2State
 from agent2_codegen.io import write_generated_files
 
@@ -50,8 +56,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store for tracking generation jobs
-generation_jobs = {}
+# Store for tracking generation jobs: bounded in size, entries expire after a day.
+# run_generation_task is async and updates jobs from the event loop, but the
+# pipeline it awaits runs in worker threads (asyncio.to_thread and LangGraph's
+# executor); generation_jobs_lock guards the store for the synchronous helpers
+# (update_job) so it stays safe if they are called from those threads.
+generation_jobs = TTLCache(maxsize=10_000, ttl=86_400)
+generation_jobs_lock = threading.Lock()
+
+# Start order of jobs ("started_at" only has second precision, so it ties)
+_job_sequence = count()
+
+# AGENT_DEBUG=1 enables stricter checks of pipeline output
+AGENT_DEBUG = os.environ.get("AGENT_DEBUG") == "1"
+
+# Generated files smaller than this (in bytes) are also inlined in the /generate response;
+# everything else is only available on disk under output_directory
+INLINE_FILE_MAX_BYTES = 4096
 
 
 # ============== Response Models ==============
@@ -62,7 +83,8 @@ class GenerateAgentResponse(BaseModel):
     status: str
     message: str
     manifest: Optional[dict] = None
-    generated_files: Optional[dict] = None
+    generated_files: Optional[list[str]] = None
+    inline_files: Optional[dict[str, str]] = None
     output_directory: Optional[str] = None
     progress_events: list[dict] = []
     errors: list[str] = []
@@ -80,42 +102,92 @@ class JobStatus(BaseModel):
 
 # ============== Helper Functions ==============
 
-def run_code_generation(input_data: dict, output_dir: str) -> dict:
-    """Run the code generation pipeline."""
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO 8601 string with second precision."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+@lru_cache(maxsize=1)
+def _utc_timestamp_for(second: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(second))
+
+
+def cached_utc_timestamp() -> str:
+    """Like utc_timestamp, but formatted at most once per second."""
+    return _utc_timestamp_for(int(time.time()))
+
+
+def intern_tool_slugs(entries) -> None:
+    """
+    Intern the tool_slug of each entry in place.
+    
+    The same slugs recur across tool_registry, tools_required and actions;
+    interning shares one string object per slug and lets dict/set lookups
+    on them hit CPython's identity fast path.
+    """
+    for entry in entries or ():
+        slug = entry.get("tool_slug") if isinstance(entry, dict) else None
+        if isinstance(slug, str):
+            entry["tool_slug"] = sys.intern(slug)
+
+
+async def run_code_generation(input_data: dict, output_dir: str) -> dict:
+    """
+    Run the code generation pipeline.
+    
+    The graph runs via ainvoke: LangGraph executes the (blocking) nodes in
+    worker threads, so the event loop stays free while LLM calls are in flight.
+    """
     logger.info(f"Starting code generation for pipeline: {input_data.get('pipeline_id')}")
     
+    # Intern slugs before the state indexes tool_registry by them
+    agent_spec = input_data.get("agent_spec", {})
+    intern_tool_slugs(input_data.get("tool_registry"))
+    if isinstance(agent_spec, dict):
+        intern_tool_slugs(agent_spec.get("tools_required"))
+        intern_tool_slugs(agent_spec.get("actions"))
+    
     # Create initial state
     state = Agent2State(
         pipeline_id=input_data.get("pipeline_id", "unknown"),
         agent_spec_version=input_data.get("agent_spec_version", "v1"),
         user_query=input_data.get("user_query", ""),
-        agent_spec=input_data.get("agent_spec", {}),
+        agent_spec=agent_spec,
         tool_registry=input_data.get("tool_registry", []),
         integrations=input_data.get("integrations", {})
     )
     
-    # Run graph
-    graph = create_graph()
-    final_state_dict = graph.invoke(state)
-    final_state = Agent2State(**final_state_dict) if isinstance(final_state_dict, dict) else final_state_dict
+    # Run graph (compiled once per process)
+    graph = get_graph()
+    final_state_dict = await graph.ainvoke(state)
+    final_state = Agent2State.from_dict(final_state_dict, strict=AGENT_DEBUG) if isinstance(final_state_dict, dict) else final_state_dict
     
-    # Write files to disk
+    # Write files to disk; the response only carries paths plus small files inline
     output_path = None
-    if final_state.generated_files:
-        write_generated_files(
-            final_state.generated_files,
+    generated_files = final_state.generated_files
+    if generated_files:
+        await asyncio.to_thread(
+            write_generated_files,
+            generated_files,
             output_dir,
             final_state.pipeline_id
         )
         output_path = f"{output_dir}/{final_state.pipeline_id}"
     
+    inline_files = {
+        file_path: content
+        for file_path, content in generated_files.items()
+        if len(content.encode("utf-8")) < INLINE_FILE_MAX_BYTES
+    }
+    
     return {
         "pipeline_id": final_state.pipeline_id,
         "status": final_state.status,
         "manifest": final_state.manifest,
-        "generated_files": final_state.generated_files,
+        "generated_files": list(generated_files),
+        "inline_files": inline_files,
         "output_directory": output_path,
-        "progress_events": final_state.progress_events,
+        "progress_events": list(final_state.progress_events),
         "errors": final_state.errors or []
     }
 
@@ -141,7 +213,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {"status": "healthy", "timestamp": cached_utc_timestamp()}
 
 
 @app.post("/generate", response_model=GenerateAgentResponse)
@@ -150,7 +222,8 @@ async def generate_agent(body: dict = Body(..., description="Agent spec JSON (pi
     Generate agent code from specification (synchronous).
     
     Expects JSON in the request body matching the agent spec format.
-    This endpoint blocks until code generation is complete.
+    This endpoint waits until code generation is complete; the pipeline
+    runs without blocking the event loop, so other requests are still served.
     For long-running generations, use /generate/async instead.
     """
     pipeline_id = body.get("pipeline_id") or "unknown"
@@ -161,7 +234,7 @@ async def generate_agent(body: dict = Body(..., description="Agent spec JSON (pi
 
     try:
         output_dir = os.environ.get("AGENT_OUTPUT_DIR", "./generated_agents")
-        result = run_code_generation(body, output_dir)
+        result = await run_code_generation(body, output_dir)
 
         return GenerateAgentResponse(
             pipeline_id=result["pipeline_id"],
@@ -169,6 +242,7 @@ async def generate_agent(body: dict = Body(..., description="Agent spec JSON (pi
             message="Agent code generated successfully" if result["status"] == "success" else "Generation completed with errors",
             manifest=result.get("manifest"),
             generated_files=result.get("generated_files"),
+            inline_files=result.get("inline_files"),
             output_directory=result.get("output_directory"),
             progress_events=result.get("progress_events", []),
             errors=result.get("errors", [])
@@ -194,29 +268,37 @@ async def generate_agent_async(background_tasks: BackgroundTasks, body: dict = B
     if not body.get("agent_spec"):
         raise HTTPException(status_code=400, detail="Request body must include 'agent_spec'")
 
-    generation_jobs[pipeline_id] = {
-        "status": "pending",
-        "started_at": datetime.utcnow().isoformat(),
-        "completed_at": None,
-        "output_directory": None,
-        "errors": []
-    }
+    with generation_jobs_lock:
+        generation_jobs[pipeline_id] = {
+            "status": "pending",
+            "seq": next(_job_sequence),
+            "started_at": utc_timestamp(),
+            "completed_at": None,
+            "output_directory": None,
+            "errors": []
+        }
+
+    def update_job(pid: str, fields: dict):
+        with generation_jobs_lock:
+            job = generation_jobs.get(pid)
+            if job is not None:  # May have been evicted meanwhile
+                job.update(fields)
 
-    def run_generation_task(input_data: dict, pid: str):
+    async def run_generation_task(input_data: dict, pid: str):
         try:
             output_dir = os.environ.get("AGENT_OUTPUT_DIR", "./generated_agents")
-            result = run_code_generation(input_data, output_dir)
-            generation_jobs[pid].update({
+            result = await run_code_generation(input_data, output_dir)
+            update_job(pid, {
                 "status": result["status"],
-                "completed_at": datetime.utcnow().isoformat(),
+                "completed_at": utc_timestamp(),
                 "output_directory": result.get("output_directory"),
                 "errors": result.get("errors", [])
             })
         except Exception as e:
             logger.error(f"Background generation failed: {e}")
-            generation_jobs[pid].update({
+            update_job(pid, {
                 "status": "error",
-                "completed_at": datetime.utcnow().isoformat(),
+                "completed_at": utc_timestamp(),
                 "errors": [str(e)]
             })
 
@@ -233,10 +315,11 @@ async def generate_agent_async(background_tasks: BackgroundTasks, body: dict = B
 @app.get("/jobs/{pipeline_id}", response_model=JobStatus)
 async def get_job_status(pipeline_id: str):
     """Get the status of a generation job."""
-    if pipeline_id not in generation_jobs:
+    with generation_jobs_lock:
+        job = generation_jobs.get(pipeline_id)
+    if job is None:
         raise HTTPException(status_code=404, detail=f"Job not found: {pipeline_id}")
     
-    job = generation_jobs[pipeline_id]
     return JobStatus(
         pipeline_id=pipeline_id,
         status=job["status"],
@@ -248,8 +331,16 @@ async def get_job_status(pipeline_id: str):
 
 
 @app.get("/jobs")
-async def list_jobs():
-    """List all generation jobs."""
+async def list_jobs(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs to return"),
+    offset: int = Query(0, ge=0, description="Number of jobs to skip")
+):
+    """List generation jobs, newest first, one page at a time."""
+    with generation_jobs_lock:
+        # Partial selection of the first offset + limit jobs; no full sort
+        newest = heapq.nlargest(offset + limit, generation_jobs.items(), key=lambda kv: kv[1]["seq"])
+        total = len(generation_jobs)
+    page = islice(newest, offset, None)
     return {
         "jobs": [
             {
@@ -258,8 +349,11 @@ async def list_jobs():
                 "started_at": job["started_at"],
                 "completed_at": job.get("completed_at")
             }
-            for pid, job in generation_jobs.items()
-        ]
+            for pid, job in page
+        ],
+        "total": total,
+        "limit": limit,
+        "offset": offset
     }
 
 
@@ -1,33 +1,63 @@
 """State model for Agent 2 codegen pipeline."""
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
 
+# Progress events kept per run; older events are dropped beyond this
+MAX_PROGRESS_EVENTS = 256
 
-class Agent2State(BaseModel):
-    """State passed through LangGraph nodes."""
+
+@dataclass(slots=True)
+class Agent2State:
+    """
+    State passed through LangGraph nodes.
+    
+    A plain slotted dataclass rather than a Pydantic model: the state is
+    rebuilt at every node boundary and on the final result, and field
+    validation of large dicts (tool_registry, generated_files) on each
+    round-trip is pure overhead. Input validation is done by validate_input.
+    """
     
     # Input
     pipeline_id: str
-    agent_spec_version: str = "v1"
     user_query: str
     agent_spec: Dict[str, Any]
     tool_registry: List[Dict[str, Any]]
     integrations: Dict[str, Any]
+    agent_spec_version: str = "v1"
+    
+    # tool_registry indexed by tool_slug (derived from tool_registry if not given)
+    tool_registry_by_slug: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     
     # Processing
-    progress_events: List[Dict[str, Any]] = Field(default_factory=list)
-    errors: List[Dict[str, Any]] = Field(default_factory=list)
+    progress_events: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_PROGRESS_EVENTS))
+    errors: List[Dict[str, Any]] = field(default_factory=list)
     validation_passed: bool = False
     
     # Planning
-    files_to_generate: List[str] = Field(default_factory=list)
+    files_to_generate: List[str] = field(default_factory=list)
     
     # Generation
-    generated_files: Dict[str, str] = Field(default_factory=dict)
+    generated_files: Dict[str, str] = field(default_factory=dict)
     
     # Output
     manifest: Optional[Dict[str, Any]] = None
     status: str = "processing"
     
-    class Config:
-        arbitrary_types_allowed = True
+    def __post_init__(self) -> None:
+        if not self.tool_registry_by_slug and self.tool_registry:
+            self.tool_registry_by_slug = {
+                tool["tool_slug"]: tool for tool in self.tool_registry if tool.get("tool_slug")
+            }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], strict: bool = False) -> "Agent2State":
+        """
+        Build a state from a dict (e.g. LangGraph's final output).
+        
+        Unknown keys are ignored unless strict is set, in which case they
+        raise TypeError (useful in debug runs to catch state drift).
+        """
+        if strict:
+            return cls(**data)
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
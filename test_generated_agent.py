@@ -7,8 +7,31 @@ Example: python test_generated_agent.py test-pipeline-001
 
 import sys
 import os
+import importlib.util
 from pathlib import Path
 
+# Loaded agent modules keyed by (agent.py path, mtime), so repeated checks of an
+# unchanged agent in one process reuse the module instead of re-executing it.
+# Compiled bytecode is cached on disk by the source loader (__pycache__, PEP 3147).
+_loaded_agents = {}
+
+
+def load_agent_module(agent_path: Path):
+    """Import agent.py from agent_path, reusing a previous load if unchanged."""
+    agent_file = agent_path / "agent.py"
+    key = (agent_file, agent_file.stat().st_mtime_ns)
+    agent_module = _loaded_agents.get(key)
+    if agent_module is None:
+        spec = importlib.util.spec_from_file_location("agent", agent_file)
+        agent_module = importlib.util.module_from_spec(spec)
+        sys.modules["agent"] = agent_module
+        spec.loader.exec_module(agent_module)
+        _loaded_agents[key] = agent_module
+    else:
+        sys.modules["agent"] = agent_module
+    return agent_module
+
+
 def test_agent(pipeline_id: str):
     """Test that a generated agent can be imported and initialized."""
     agent_path = Path(__file__).parent / "generated_agents" / pipeline_id
@@ -38,11 +61,7 @@ def test_agent(pipeline_id: str):
             # Try importing agent module
             print("   Importing agent module...")
             # Import from the parent directory context
-            import importlib.util
-            spec = importlib.util.spec_from_file_location("agent", agent_path / "agent.py")
-            agent_module = importlib.util.module_from_spec(spec)
-            sys.modules["agent"] = agent_module
-            spec.loader.exec_module(agent_module)
+            agent = load_agent_module(agent_path)
             print("   ✅ Agent module imported successfully")
         finally:
             os.chdir(original_cwd)
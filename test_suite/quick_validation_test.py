@@ -1,5 +1,6 @@
 """Quick validation test that doesn't require LLM API calls."""
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add parent directory to path
@@ -27,11 +28,24 @@ files_to_check = [
     "tools/pipedream_client.py"
 ]
 
-print("Loading reference agent files...")
-for file_path in files_to_check:
+
+def read_reference_file(file_path):
+    """Read a reference file, or return None if it is missing."""
     full_path = reference_agent_path / file_path
     if full_path.exists():
-        reference_files[file_path] = full_path.read_text(encoding='utf-8')
+        return full_path.read_text(encoding='utf-8')
+    return None
+
+
+# Files are independent: read them, and later validate them, concurrently.
+# Threads rather than processes - a handful of small files does not pay for
+# process startup.
+executor = ThreadPoolExecutor(max_workers=len(files_to_check))
+
+print("Loading reference agent files...")
+for file_path, content in zip(files_to_check, executor.map(read_reference_file, files_to_check)):
+    if content is not None:
+        reference_files[file_path] = content
         print(f"  ✓ Loaded {file_path}")
     else:
         print(f"  ✗ Missing {file_path}")
@@ -45,8 +59,8 @@ print()
 # Test syntax validation
 print("1. Syntax Validation:")
 syntax_errors = 0
-for file_path, content in reference_files.items():
-    result = validate_python_syntax(file_path, content)
+syntax_results = executor.map(validate_python_syntax, reference_files.keys(), reference_files.values())
+for file_path, result in zip(reference_files, syntax_results):
     if result["valid"]:
         print(f"   ✓ {file_path} - Valid syntax")
     else:
@@ -59,7 +73,7 @@ print()
 
 # Test structure validation
 print("2. Structure Validation:")
-structure_result = validate_file_structure(reference_files)
+structure_result = validate_file_structure(frozenset(reference_files))
 if structure_result["valid"]:
     print("   ✓ File structure valid")
 else:
@@ -73,8 +87,11 @@ print()
 print("3. Import Validation:")
 import_errors = 0
 import_warnings = 0
-for file_path, content in reference_files.items():
-    result = validate_imports(file_path, content, reference_agent_path)
+import_results = executor.map(
+    lambda item: validate_imports(item[0], item[1], reference_agent_path),
+    reference_files.items()
+)
+for file_path, result in zip(reference_files, import_results):
     if result["valid"]:
         if result.get("warnings"):
             import_warnings += len(result["warnings"])
@@ -85,6 +102,8 @@ for file_path, content in reference_files.items():
         import_errors += len(result.get("errors", []))
         print(f"   ✗ {file_path} - {len(result.get('errors', []))} errors")
 
+executor.shutdown()
+
 print()
 print("=" * 80)
 print("SUMMARY")
@@ -1,10 +1,14 @@
 """Test runner for agent generation pipeline."""
+import asyncio
 import json
 import logging
+import logging.handlers
 import sys
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import subprocess
+import orjson
 
 # Add parent directory to path (agent2_codegen directory)
 test_suite_dir = Path(__file__).parent
@@ -16,22 +20,81 @@ if str(parent_dir) not in sys.path:
     sys.path.insert(0, str(parent_dir))
 
 # Now import from agent2_codegen
-from agent2_codegen.io import load_input_json, write_generated_files
-from agent2_codegen.graph import create_graph
+from agent2_codegen.io import write_generated_files
+from agent2_codegen.graph import get_graph
 from agent2_codegen.state import Agent2State
 
-from .validators.syntax_validator import validate_all_files as validate_syntax
+from .validators.ast_checks import run_all_checks
+from .validators.syntax_validator import build_ast_cache, collect_py_files, validate_all_files as validate_syntax
 from .validators.import_validator import validate_all_imports
 from .validators.structure_validator import validate_all_structures
 from .validators.template_compliance_validator import validate_template_compliance
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of test agents generated concurrently
+MAX_PARALLEL_TESTS = 5
+
+# Files every generated agent must contain for the test to proceed to validation
+REQUIRED_FILES_CRITICAL = (
+    "agent.py",
+    "config/agent_config.py",
+    "tools/__init__.py",
+    "tools/pipedream_client.py",
+    "tools/pipedream_tools.py"
+)
+
+# Log records buffered by the console handler between flushes (see main)
+LOG_BUFFER_CAPACITY = 1000
+
+# (handler, record) pairs logged by the test running in the current context,
+# from any logger (pipeline nodes and validators included, also in the worker
+# threads they run in); replayed when the test finishes so output from
+# concurrent tests does not interleave
+_test_log_buffer: ContextVar[Optional[List[Tuple[logging.Handler, logging.LogRecord]]]] = ContextVar(
+    "_test_log_buffer", default=None
+)
+
+
+class _TestLogBufferFilter(logging.Filter):
+    """Divert records a root handler receives while a test is running into that test's buffer."""
+    
+    def __init__(self, handler: logging.Handler):
+        super().__init__()
+        self.handler = handler
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        buffer = _test_log_buffer.get()
+        if buffer is None:
+            return True
+        buffer.append((self.handler, record))
+        return False
+
+
+def _banner(title: str, lines: List[str]) -> str:
+    """Format a report section as one multi-line string (logged with a single call)."""
+    sep = "=" * 80
+    return "\n".join([sep, title, sep, *lines])
+
+
+# Parsed JSON files (test config and test inputs) keyed by (path, mtime_ns);
+# an edited file gets a new key and is parsed again
+_CONFIG_CACHE: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+
+def _load_json_cached(path: Path) -> Dict[str, Any]:
+    """Load a JSON file, reusing the parsed result while the file is unchanged."""
+    key = (str(path), path.stat().st_mtime_ns)
+    data = _CONFIG_CACHE.get(key)
+    if data is None:
+        data = _CONFIG_CACHE[key] = orjson.loads(path.read_bytes())
+    return data
+
 
 class TestRunner:
     """Test runner for generating and validating agents."""
     
-    def __init__(self, config_path: Path, output_dir: Path, reference_path: Path):
+    def __init__(self, config_path: Path, output_dir: Path, reference_path: Path, write_to_disk: bool = False):
         """
         Initialize test runner.
         
@@ -39,32 +102,36 @@ class TestRunner:
             config_path: Path to test_agents_config.json
             output_dir: Directory for generated test agents
             reference_path: Path to reference agent (my_agent)
+            write_to_disk: Also write each generated agent under output_dir.
+                Validation only needs the in-memory files, so this is off by default.
         """
         self.config_path = config_path
         self.output_dir = output_dir
         self.reference_path = reference_path
+        self.write_to_disk = write_to_disk
         self.config = self._load_config()
         self.results = []
     
     def _load_config(self) -> Dict[str, Any]:
         """Load test configuration."""
-        with open(self.config_path, 'r') as f:
-            return json.load(f)
+        return _load_json_cached(self.config_path)
     
-    def run_all_tests(self) -> Dict[str, Any]:
+    async def run_all_tests(self) -> Dict[str, Any]:
         """
         Run all test agent generations and validations.
         
+        Tests are independent, so up to MAX_PARALLEL_TESTS of them run
+        concurrently; results keep the order of the config.
+        
         Returns:
             Dictionary with test results
         """
-        logger.info("=" * 80)
-        logger.info("AGENT GENERATION TEST SUITE")
-        logger.info("=" * 80)
-        logger.info(f"Test agents: {len(self.config['test_agents'])}")
-        logger.info(f"Output directory: {self.output_dir}")
-        logger.info(f"Reference agent: {self.reference_path}")
-        logger.info("")
+        logger.info(_banner("AGENT GENERATION TEST SUITE", [
+            f"Test agents: {len(self.config['test_agents'])}",
+            f"Output directory: {self.output_dir}",
+            f"Reference agent: {self.reference_path}",
+            ""
+        ]))
         
         all_results = {
             "total_tests": len(self.config['test_agents']),
@@ -73,35 +140,81 @@ class TestRunner:
             "test_results": []
         }
         
-        for test_config in self.config['test_agents']:
-            logger.info("")
-            logger.info("-" * 80)
-            logger.info(f"Testing: {test_config['name']}")
-            logger.info(f"Description: {test_config['description']}")
-            logger.info("-" * 80)
-            
-            result = self.run_single_test(test_config)
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_TESTS)
+        
+        async def run_bounded(test_config: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._run_buffered(test_config)
+        
+        # Buffer per test everything the root handlers would output
+        buffer_filters = [(handler, _TestLogBufferFilter(handler)) for handler in logging.getLogger().handlers]
+        for handler, buffer_filter in buffer_filters:
+            handler.addFilter(buffer_filter)
+        try:
+            results = await asyncio.gather(
+                *(run_bounded(test_config) for test_config in self.config['test_agents']),
+                return_exceptions=True
+            )
+        finally:
+            for handler, buffer_filter in buffer_filters:
+                handler.removeFilter(buffer_filter)
+        
+        for test_config, result in zip(self.config['test_agents'], results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ {test_config['name']} crashed: {result}")
+                result = {
+                    "name": test_config["name"],
+                    "description": test_config["description"],
+                    "generation_success": False,
+                    "validation_results": {},
+                    "overall_success": False,
+                    "errors": [f"Test crashed: {result}"],
+                    "warnings": []
+                }
             all_results["test_results"].append(result)
             
             if result["overall_success"]:
                 all_results["passed"] += 1
-                logger.info(f"✅ {test_config['name']} PASSED")
             else:
                 all_results["failed"] += 1
-                logger.error(f"❌ {test_config['name']} FAILED")
         
-        logger.info("")
-        logger.info("=" * 80)
-        logger.info("TEST SUITE SUMMARY")
-        logger.info("=" * 80)
-        logger.info(f"Total tests: {all_results['total_tests']}")
-        logger.info(f"Passed: {all_results['passed']}")
-        logger.info(f"Failed: {all_results['failed']}")
-        logger.info("=" * 80)
+        logger.info("\n" + _banner("TEST SUITE SUMMARY", [
+            f"Total tests: {all_results['total_tests']}",
+            f"Passed: {all_results['passed']}",
+            f"Failed: {all_results['failed']}",
+            "=" * 80
+        ]))
         
         return all_results
     
-    def run_single_test(self, test_config: Dict[str, Any]) -> Dict[str, Any]:
+    async def _run_buffered(self, test_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single test, emitting its log output in one block once it finishes."""
+        buffer: List[Tuple[logging.Handler, logging.LogRecord]] = []
+        token = _test_log_buffer.set(buffer)
+        try:
+            logger.info("\n".join([
+                "",
+                "-" * 80,
+                f"Testing: {test_config['name']}",
+                f"Description: {test_config['description']}",
+                "-" * 80
+            ]))
+            
+            result = await self.run_single_test(test_config)
+            
+            if result["overall_success"]:
+                logger.info(f"✅ {test_config['name']} PASSED")
+            else:
+                logger.error(f"❌ {test_config['name']} FAILED")
+            return result
+        finally:
+            _test_log_buffer.reset(token)
+            for handler, record in buffer:
+                handler.handle(record)
+            for handler in logging.getLogger().handlers:
+                handler.flush()
+    
+    async def run_single_test(self, test_config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Run a single test agent generation and validation.
         
@@ -129,7 +242,7 @@ class TestRunner:
                 result["errors"].append(f"Input file not found: {input_path}")
                 return result
             
-            input_data = load_input_json(str(input_path))
+            input_data = _load_json_cached(input_path)
             
             # Create state
             state = Agent2State(
@@ -141,20 +254,13 @@ class TestRunner:
                 integrations=input_data.get("integrations", {})
             )
             
-            # Run pipeline
-            graph = create_graph()
-            final_state_dict = graph.invoke(state)
-            final_state = Agent2State(**final_state_dict) if isinstance(final_state_dict, dict) else final_state_dict
+            # Run pipeline (blocking nodes run in worker threads)
+            graph = get_graph()
+            final_state_dict = await graph.ainvoke(state)
+            final_state = Agent2State.from_dict(final_state_dict) if isinstance(final_state_dict, dict) else final_state_dict
             
             # Check for critical missing files even if status is "success"
-            required_files = [
-                "agent.py",
-                "config/agent_config.py",
-                "tools/__init__.py",
-                "tools/pipedream_client.py",
-                "tools/pipedream_tools.py"
-            ]
-            missing_files = [f for f in required_files if f not in final_state.generated_files]
+            missing_files = [f for f in REQUIRED_FILES_CRITICAL if f not in final_state.generated_files]
             
             if final_state.status != "success" or missing_files:
                 if final_state.errors:
@@ -168,13 +274,15 @@ class TestRunner:
                 if final_state.status != "success" or missing_files:
                     return result
             
-            # Write files
+            # Write files (optional; the validators work on the in-memory files)
             agent_output_dir = self.output_dir / final_state.pipeline_id
-            write_generated_files(
-                final_state.generated_files,
-                str(self.output_dir),
-                final_state.pipeline_id
-            )
+            if self.write_to_disk:
+                await asyncio.to_thread(
+                    write_generated_files,
+                    final_state.generated_files,
+                    str(self.output_dir),
+                    final_state.pipeline_id
+                )
             
             result["generation_success"] = True
             result["generated_files"] = list(final_state.generated_files.keys())
@@ -183,7 +291,10 @@ class TestRunner:
             # Step 2: Validate generated agent
             logger.info("Step 2: Validating generated agent")
             try:
-                validation_results = self.validate_agent(
+                # Parsing is CPU-bound; keep it off the event loop so other
+                # tests' pipelines keep making progress meanwhile
+                validation_results = await asyncio.to_thread(
+                    self.validate_agent,
                     final_state.generated_files,
                     agent_output_dir
                 )
@@ -209,15 +320,11 @@ class TestRunner:
                 
             except Exception as e:
                 result["errors"].append(f"Validation failed: {str(e)}")
-                logger.error(f"❌ Validation failed: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"❌ Validation failed: {e}")
             
         except Exception as e:
             result["errors"].append(f"Generation failed: {str(e)}")
-            logger.error(f"❌ Generation failed: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ Generation failed: {e}")
         
         return result
     
@@ -238,9 +345,16 @@ class TestRunner:
         """
         results = {}
         
+        # Select and parse the Python files once; the validators share them
+        py_files = collect_py_files(generated_files)
+        ast_cache = build_ast_cache(py_files)
+        
+        # One traversal per file collects what the structure and import validators check
+        file_checks = run_all_checks(py_files, ast_cache)
+        
         # Syntax validation
         logger.info("  → Validating Python syntax...")
-        syntax_result = validate_syntax(generated_files)
+        syntax_result = validate_syntax(py_files, ast_cache=ast_cache)
         results["syntax"] = syntax_result
         if syntax_result["valid"]:
             logger.info(f"    ✅ Syntax valid ({syntax_result['valid_files']}/{syntax_result['total_files']} files)")
@@ -249,7 +363,7 @@ class TestRunner:
         
         # Structure validation
         logger.info("  → Validating file structure...")
-        structure_result = validate_all_structures(generated_files)
+        structure_result = validate_all_structures(generated_files, ast_cache=ast_cache, file_checks=file_checks)
         results["structure"] = structure_result
         if structure_result["valid"]:
             logger.info("    ✅ Structure valid")
@@ -258,7 +372,7 @@ class TestRunner:
         
         # Import validation
         logger.info("  → Validating imports...")
-        import_result = validate_all_imports(generated_files, agent_dir)
+        import_result = validate_all_imports(py_files, agent_dir, ast_cache=ast_cache, file_checks=file_checks)
         results["imports"] = import_result
         if import_result["valid"]:
             logger.info("    ✅ Imports valid")
@@ -270,7 +384,8 @@ class TestRunner:
         if self.reference_path.exists():
             compliance_result = validate_template_compliance(
                 generated_files,
-                self.reference_path
+                self.reference_path,
+                ast_cache=ast_cache
             )
             results["template_compliance"] = compliance_result
             if compliance_result["valid"]:
@@ -286,10 +401,22 @@ class TestRunner:
 
 def main():
     """Main entry point for test runner."""
+    # Buffer console output. While tests run, run_all_tests diverts every record
+    # reaching this handler into the running test's buffer; the buffer is
+    # replayed into it and flushed once per completed test. Outside tests it
+    # flushes when full and right away on errors.
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+        handlers=[logging.handlers.MemoryHandler(
+            capacity=LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=stream_handler
+        )]
     )
     
     # Get paths - ensure we're using the correct base directory
@@ -310,8 +437,13 @@ def main():
     output_dir.mkdir(exist_ok=True)
     
     # Run tests
-    runner = TestRunner(config_path, output_dir, reference_path)
-    results = runner.run_all_tests()
+    runner = TestRunner(
+        config_path,
+        output_dir,
+        reference_path,
+        write_to_disk="--no-write" not in sys.argv[1:]
+    )
+    results = asyncio.run(runner.run_all_tests())
     
     # Save results
     results_file = output_dir / "test_results.json"
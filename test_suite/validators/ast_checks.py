@@ -0,0 +1,163 @@
+"""Fused AST checks for generated Python files.
+
+Each file is traversed once; the visitor collects everything the import and
+structure validators need, instead of each validator walking the tree itself.
+"""
+import ast
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Sequence, Tuple, Type
+
+# AST fields holding statement lists. Imports and definitions are statements,
+# so the traversal only follows these and never visits expressions.
+_BODY_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+
+class FileChecks(ast.NodeVisitor):
+    """
+    Single-pass checks for any Python file.
+    
+    Collects every import in the file, including imports inside functions,
+    in the format returned by extract_imports. Subclasses additionally record
+    module-level definitions for the structure checks of specific files.
+    """
+    
+    def __init__(self):
+        self.imports: Dict[str, Any] = {"imports": [], "from_imports": {}}
+        self._depth = 0  # > 0 inside a function or class body
+    
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports["imports"].append(alias.name)
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        names = self.imports["from_imports"].setdefault(node.module or "", [])
+        for alias in node.names:
+            names.append(alias.name)
+    
+    def visit_FunctionDef(self, node: ast.AST) -> None:
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    visit_ClassDef = visit_FunctionDef
+    
+    def generic_visit(self, node: ast.AST) -> None:
+        for field in _BODY_FIELDS:
+            for child in getattr(node, field, ()):
+                self.visit(child)
+
+
+class AgentPyChecks(FileChecks):
+    """Also records the module-level imports, root_agent variable and _get_model function of agent.py."""
+    
+    def __init__(self):
+        super().__init__()
+        self.has_google_adk = False
+        self.has_config_import = False
+        self.has_tools_import = False
+        self.has_root_agent = False
+        self.has_get_model = False
+    
+    def visit_Import(self, node: ast.Import) -> None:
+        super().visit_Import(node)
+        if self._depth == 0:
+            for alias in node.names:
+                if "google.adk" in alias.name or "Agent" in alias.name:
+                    self.has_google_adk = True
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        super().visit_ImportFrom(node)
+        if self._depth == 0:
+            if node.module and "config" in node.module:
+                self.has_config_import = True
+            if node.module and "tools" in node.module:
+                self.has_tools_import = True
+    
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if self._depth == 0:
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "root_agent":
+                    self.has_root_agent = True
+                    break
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        if self._depth == 0 and node.name == "_get_model":
+            self.has_get_model = True
+        super().visit_FunctionDef(node)
+
+
+class ConfigChecks(FileChecks):
+    """Also finds the module-level get_agent_config() of config/agent_config.py."""
+    
+    def __init__(self):
+        super().__init__()
+        self.get_config: Optional[ast.FunctionDef] = None
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        if self._depth == 0 and node.name == "get_agent_config" and self.get_config is None:
+            self.get_config = node
+        super().visit_FunctionDef(node)
+
+
+class ToolsChecks(FileChecks):
+    """Also finds the module-level get_agent_tools() of tools/__init__.py."""
+    
+    def __init__(self):
+        super().__init__()
+        self.has_get_tools = False
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        if self._depth == 0 and node.name == "get_agent_tools":
+            self.has_get_tools = True
+        super().visit_FunctionDef(node)
+
+
+_CHECKS_BY_FILE: Mapping[str, Type[FileChecks]] = MappingProxyType({
+    "agent.py": AgentPyChecks,
+    "config/agent_config.py": ConfigChecks,
+    "tools/__init__.py": ToolsChecks,
+})
+
+
+def run_checks(file_path: str, content: str, tree: Optional[ast.Module] = None) -> FileChecks:
+    """
+    Run every AST check that applies to a file in one traversal.
+    
+    Args:
+        file_path: Path of the file (selects the checks to run)
+        content: File content
+        tree: Already parsed module for content, if available
+        
+    Returns:
+        The visitor, holding the collected imports and check results
+        
+    Raises:
+        SyntaxError: If no tree is given and content does not parse
+    """
+    if tree is None:
+        tree = ast.parse(content)
+    checks = _CHECKS_BY_FILE.get(file_path, FileChecks)()
+    checks.visit(tree)
+    return checks
+
+
+def run_all_checks(
+    py_files: Sequence[Tuple[str, str]],
+    ast_cache: Dict[str, ast.Module]
+) -> Dict[str, FileChecks]:
+    """
+    Run the checks for every Python file that parsed.
+    
+    Args:
+        py_files: (file_path, content) pairs of the Python files
+        ast_cache: Parsed modules from build_ast_cache
+        
+    Returns:
+        Dictionary mapping file paths to their checks
+    """
+    return {
+        file_path: run_checks(file_path, content, ast_cache[file_path])
+        for file_path, content in py_files
+        if file_path in ast_cache
+    }
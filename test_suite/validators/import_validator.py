@@ -3,46 +3,72 @@ import ast
 import importlib.util
 import sys
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Sequence, Set, Tuple
 import logging
+from cachetools import LRUCache
+from .ast_checks import FileChecks, run_checks
 
 logger = logging.getLogger(__name__)
 
+# Imports each file is expected to contain (files not listed have no requirements).
+# Strings are interned so lookups by the (interned) paths from collect_py_files
+# and comparisons with parsed names can short-circuit on identity.
+_REQUIRED_IMPORTS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    sys.intern(file_path): tuple(map(sys.intern, names))
+    for file_path, names in {
+        "agent.py": ("google.adk", "Agent"),
+        "tools/__init__.py": ("pipedream_tools",),
+        "tools/pipedream_tools.py": ("pipedream_client",),
+    }.items()
+})
 
-def extract_imports(content: str) -> Dict[str, List[str]]:
+# extract_imports results keyed by file content. Many generated files (the
+# tools/ boilerplate in particular) are byte-identical across agents.
+_imports_cache: LRUCache = LRUCache(maxsize=2048)
+_imports_cache_lock = threading.Lock()
+
+
+def extract_imports(content: str, tree: Optional[ast.Module] = None) -> Dict[str, List[str]]:
     """
     Extract import statements from Python code.
     
+    Results are cached by content and shared between callers; do not mutate them.
+    
     Args:
         content: Python code as string
+        tree: Already parsed module for content, if available (used on a cache miss)
         
     Returns:
         Dictionary with 'imports' (list of module names) and 'from_imports' (dict)
     """
+    with _imports_cache_lock:
+        imports = _imports_cache.get(content)
+    if imports is None:
+        imports = _collect_imports(content, tree)
+        with _imports_cache_lock:
+            _imports_cache[content] = imports
+    return imports
+
+
+def _collect_imports(content: str, tree: Optional[ast.Module]) -> Dict[str, List[str]]:
+    """Collect the imports of a module (parsing content if no tree is given)."""
     try:
-        tree = ast.parse(content)
-        imports = []
-        from_imports = {}
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                if module not in from_imports:
-                    from_imports[module] = []
-                for alias in node.names:
-                    from_imports[module].append(alias.name)
-        
-        return {"imports": imports, "from_imports": from_imports}
+        return run_checks("", content, tree).imports
     except SyntaxError:
         # Syntax errors are handled by syntax_validator
         return {"imports": [], "from_imports": {}}
 
 
-def validate_imports(file_path: str, content: str, agent_dir: Path) -> Dict[str, Any]:
+def validate_imports(
+    file_path: str,
+    content: str,
+    agent_dir: Path,
+    tree: Optional[ast.Module] = None,
+    checks: Optional[FileChecks] = None
+) -> Dict[str, Any]:
     """
     Validate that imports in a file are reasonable.
     
@@ -50,6 +76,8 @@ def validate_imports(file_path: str, content: str, agent_dir: Path) -> Dict[str,
         file_path: Path to the file
         content: File content
         agent_dir: Directory where the agent is located
+        tree: Already parsed module for content, if available
+        checks: Results of run_checks for this file, if available
         
     Returns:
         Dictionary with validation results
@@ -57,30 +85,23 @@ def validate_imports(file_path: str, content: str, agent_dir: Path) -> Dict[str,
     errors = []
     warnings = []
     
-    imports = extract_imports(content)
-    
-    # Check for common issues
-    required_imports = {
-        "agent.py": ["google.adk", "Agent"],
-        "config/agent_config.py": [],
-        "tools/__init__.py": ["pipedream_tools"],
-        "tools/pipedream_tools.py": ["pipedream_client"],
-        "tools/pipedream_client.py": []
-    }
+    imports = checks.imports if checks is not None else extract_imports(content, tree=tree)
     
     # Validate expected imports exist
-    if file_path in required_imports:
-        expected = required_imports[file_path]
+    expected = _REQUIRED_IMPORTS.get(file_path)
+    if expected:
+        
+        # Names match exactly (imported modules and names imported from them);
+        # from-import modules match by substring (e.g. "google.adk.agents")
+        imported_names = set(imports["imports"])
+        for names in imports["from_imports"].values():
+            imported_names.update(names)
+        from_modules = imports["from_imports"].keys()
+        
         for expected_import in expected:
-            found = False
-            # Check direct imports
-            if expected_import in imports["imports"]:
-                found = True
-            # Check from imports
-            for module, names in imports["from_imports"].items():
-                if expected_import in module or expected_import in names:
-                    found = True
-                    break
+            found = expected_import in imported_names or any(
+                expected_import in module for module in from_modules
+            )
             
             if not found and expected_import:
                 warnings.append({
@@ -113,13 +134,20 @@ def validate_imports(file_path: str, content: str, agent_dir: Path) -> Dict[str,
     }
 
 
-def validate_all_imports(generated_files: Dict[str, str], agent_dir: Path) -> Dict[str, Any]:
+def validate_all_imports(
+    py_files: Sequence[Tuple[str, str]],
+    agent_dir: Path,
+    ast_cache: Optional[Dict[str, ast.Module]] = None,
+    file_checks: Optional[Dict[str, FileChecks]] = None
+) -> Dict[str, Any]:
     """
     Validate imports for all Python files.
     
     Args:
-        generated_files: Dictionary mapping file paths to contents
+        py_files: (file_path, content) pairs of the Python files
         agent_dir: Directory where agent is located
+        ast_cache: Parsed modules from build_ast_cache, if available
+        file_checks: Results of run_all_checks, if available
         
     Returns:
         Overall validation results
@@ -131,13 +159,21 @@ def validate_all_imports(generated_files: Dict[str, str], agent_dir: Path) -> Di
         "warnings": []
     }
     
-    for file_path, content in generated_files.items():
-        if file_path.endswith('.py'):
-            results["total_files"] += 1
-            validation = validate_imports(file_path, content, agent_dir)
-            if not validation["valid"]:
-                results["valid"] = False
-            results["errors"].extend(validation["errors"])
-            results["warnings"].extend(validation["warnings"])
+    ast_cache = ast_cache or {}
+    file_checks = file_checks or {}
+    
+    for file_path, content in py_files:
+        results["total_files"] += 1
+        validation = validate_imports(
+            file_path,
+            content,
+            agent_dir,
+            tree=ast_cache.get(file_path),
+            checks=file_checks.get(file_path)
+        )
+        if not validation["valid"]:
+            results["valid"] = False
+        results["errors"].extend(validation["errors"])
+        results["warnings"].extend(validation["warnings"])
     
     return results
@@ -1,14 +1,16 @@
 """Structure validation for generated agents."""
 import ast
 import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from typing import Dict, FrozenSet, List, Any, Optional, Set
 import logging
+from .ast_checks import AgentPyChecks, ConfigChecks, FileChecks, ToolsChecks, run_checks
 
 logger = logging.getLogger(__name__)
 
 
-REQUIRED_FILES = {
+REQUIRED_FILES: FrozenSet[str] = frozenset(map(sys.intern, {
     "__init__.py",
     "agent.py",
     "config/__init__.py",
@@ -19,23 +21,25 @@ REQUIRED_FILES = {
     "requirements.txt",
     ".env.example",
     "README.md"
-}
+}))
 
 
-def validate_file_structure(generated_files: Dict[str, str]) -> Dict[str, Any]:
+def validate_file_structure(generated_file_set: FrozenSet[str]) -> Dict[str, Any]:
     """
     Validate that all required files are present.
     
     Args:
-        generated_files: Dictionary mapping file paths to contents
+        generated_file_set: Paths of the generated files
         
     Returns:
         Validation results
     """
+    if generated_file_set == REQUIRED_FILES:
+        return {"valid": True, "errors": [], "warnings": [], "missing_files": [], "extra_files": []}
+    
     errors = []
     warnings = []
     
-    generated_file_set = set(generated_files.keys())
     missing_files = REQUIRED_FILES - generated_file_set
     extra_files = generated_file_set - REQUIRED_FILES
     
@@ -62,12 +66,18 @@ def validate_file_structure(generated_files: Dict[str, str]) -> Dict[str, Any]:
     }
 
 
-def validate_agent_py_structure(content: str) -> Dict[str, Any]:
+def validate_agent_py_structure(
+    content: str,
+    tree: Optional[ast.Module] = None,
+    checks: Optional[AgentPyChecks] = None
+) -> Dict[str, Any]:
     """
     Validate structure of agent.py file.
     
     Args:
         content: Content of agent.py
+        tree: Already parsed module for content, if available
+        checks: Results of run_checks for this file, if available
         
     Returns:
         Validation results
@@ -76,65 +86,35 @@ def validate_agent_py_structure(content: str) -> Dict[str, Any]:
     warnings = []
     
     try:
-        tree = ast.parse(content)
-        
-        # Check for required imports
-        has_google_adk = False
-        has_config_import = False
-        has_tools_import = False
-        has_root_agent = False
+        # Check for required imports, root_agent variable and _get_model function
+        if checks is None:
+            checks = run_checks("agent.py", content, tree)
         
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    if "google.adk" in alias.name or "Agent" in alias.name:
-                        has_google_adk = True
-            elif isinstance(node, ast.ImportFrom):
-                if node.module and "config" in node.module:
-                    has_config_import = True
-                if node.module and "tools" in node.module:
-                    has_tools_import = True
-        
-        # Check for root_agent variable
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and target.id == "root_agent":
-                        has_root_agent = True
-                        break
-        
-        if not has_google_adk:
+        if not checks.has_google_adk:
             errors.append({
                 "type": "missing_import",
                 "message": "Missing import from google.adk"
             })
         
-        if not has_config_import:
+        if not checks.has_config_import:
             errors.append({
                 "type": "missing_import",
                 "message": "Missing import from .config"
             })
         
-        if not has_tools_import:
+        if not checks.has_tools_import:
             errors.append({
                 "type": "missing_import",
                 "message": "Missing import from .tools"
             })
         
-        if not has_root_agent:
+        if not checks.has_root_agent:
             errors.append({
                 "type": "missing_variable",
                 "message": "Missing root_agent variable"
             })
         
-        # Check for _get_model function
-        has_get_model = False
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name == "_get_model":
-                has_get_model = True
-                break
-        
-        if not has_get_model:
+        if not checks.has_get_model:
             warnings.append({
                 "type": "missing_function",
                 "message": "Missing _get_model() function (recommended but not required)"
@@ -153,12 +133,18 @@ def validate_agent_py_structure(content: str) -> Dict[str, Any]:
     }
 
 
-def validate_config_structure(content: str) -> Dict[str, Any]:
+def validate_config_structure(
+    content: str,
+    tree: Optional[ast.Module] = None,
+    checks: Optional[ConfigChecks] = None
+) -> Dict[str, Any]:
     """
     Validate structure of config/agent_config.py file.
     
     Args:
         content: Content of config file
+        tree: Already parsed module for content, if available
+        checks: Results of run_checks for this file, if available
         
     Returns:
         Validation results
@@ -166,22 +152,18 @@ def validate_config_structure(content: str) -> Dict[str, Any]:
     errors = []
     
     try:
-        tree = ast.parse(content)
-        
         # Check for get_agent_config function
-        has_get_config = False
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name == "get_agent_config":
-                has_get_config = True
-                # Check return type
-                if not node.returns:
-                    errors.append({
-                        "type": "missing_return_annotation",
-                        "message": "get_agent_config() should have return type annotation"
-                    })
-                break
+        if checks is None:
+            checks = run_checks("config/agent_config.py", content, tree)
+        
+        # Check return type
+        if checks.get_config is not None and not checks.get_config.returns:
+            errors.append({
+                "type": "missing_return_annotation",
+                "message": "get_agent_config() should have return type annotation"
+            })
         
-        if not has_get_config:
+        if checks.get_config is None:
             errors.append({
                 "type": "missing_function",
                 "message": "Missing get_agent_config() function"
@@ -210,12 +192,18 @@ def validate_config_structure(content: str) -> Dict[str, Any]:
     }
 
 
-def validate_tools_structure(content: str) -> Dict[str, Any]:
+def validate_tools_structure(
+    content: str,
+    tree: Optional[ast.Module] = None,
+    checks: Optional[ToolsChecks] = None
+) -> Dict[str, Any]:
     """
     Validate structure of tools/__init__.py file.
     
     Args:
         content: Content of tools/__init__.py
+        tree: Already parsed module for content, if available
+        checks: Results of run_checks for this file, if available
         
     Returns:
         Validation results
@@ -223,16 +211,11 @@ def validate_tools_structure(content: str) -> Dict[str, Any]:
     errors = []
     
     try:
-        tree = ast.parse(content)
-        
         # Check for get_agent_tools function
-        has_get_tools = False
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) and node.name == "get_agent_tools":
-                has_get_tools = True
-                break
+        if checks is None:
+            checks = run_checks("tools/__init__.py", content, tree)
         
-        if not has_get_tools:
+        if not checks.has_get_tools:
             errors.append({
                 "type": "missing_function",
                 "message": "Missing get_agent_tools() function"
@@ -251,12 +234,18 @@ def validate_tools_structure(content: str) -> Dict[str, Any]:
     }
 
 
-def validate_all_structures(generated_files: Dict[str, str]) -> Dict[str, Any]:
+def validate_all_structures(
+    generated_files: Dict[str, str],
+    ast_cache: Optional[Dict[str, ast.Module]] = None,
+    file_checks: Optional[Dict[str, FileChecks]] = None
+) -> Dict[str, Any]:
     """
     Validate structure of all generated files.
     
     Args:
         generated_files: Dictionary mapping file paths to contents
+        ast_cache: Parsed modules from build_ast_cache, if available
+        file_checks: Results of run_all_checks, if available
         
     Returns:
         Overall validation results
@@ -267,8 +256,11 @@ def validate_all_structures(generated_files: Dict[str, str]) -> Dict[str, Any]:
         "warnings": []
     }
     
+    ast_cache = ast_cache or {}
+    file_checks = file_checks or {}
+    
     # File structure validation
-    file_structure = validate_file_structure(generated_files)
+    file_structure = validate_file_structure(frozenset(generated_files))
     if not file_structure["valid"]:
         results["valid"] = False
     results["errors"].extend(file_structure["errors"])
@@ -276,7 +268,11 @@ def validate_all_structures(generated_files: Dict[str, str]) -> Dict[str, Any]:
     
     # agent.py validation
     if "agent.py" in generated_files:
-        agent_validation = validate_agent_py_structure(generated_files["agent.py"])
+        agent_validation = validate_agent_py_structure(
+            generated_files["agent.py"],
+            tree=ast_cache.get("agent.py"),
+            checks=file_checks.get("agent.py")
+        )
         if not agent_validation["valid"]:
             results["valid"] = False
         results["errors"].extend(agent_validation["errors"])
@@ -284,7 +280,11 @@ def validate_all_structures(generated_files: Dict[str, str]) -> Dict[str, Any]:
     
     # config/agent_config.py validation
     if "config/agent_config.py" in generated_files:
-        config_validation = validate_config_structure(generated_files["config/agent_config.py"])
+        config_validation = validate_config_structure(
+            generated_files["config/agent_config.py"],
+            tree=ast_cache.get("config/agent_config.py"),
+            checks=file_checks.get("config/agent_config.py")
+        )
         if not config_validation["valid"]:
             results["valid"] = False
         results["errors"].extend(config_validation["errors"])
@@ -292,7 +292,11 @@ def validate_all_structures(generated_files: Dict[str, str]) -> Dict[str, Any]:
     
     # tools/__init__.py validation
     if "tools/__init__.py" in generated_files:
-        tools_validation = validate_tools_structure(generated_files["tools/__init__.py"])
+        tools_validation = validate_tools_structure(
+            generated_files["tools/__init__.py"],
+            tree=ast_cache.get("tools/__init__.py"),
+            checks=file_checks.get("tools/__init__.py")
+        )
         if not tools_validation["valid"]:
             results["valid"] = False
         results["errors"].extend(tools_validation["errors"])
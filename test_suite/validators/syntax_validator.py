@@ -1,26 +1,66 @@
 """Syntax validation for generated Python code."""
 import ast
 import logging
-from typing import Dict, List, Any
+import sys
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
 
-def validate_python_syntax(file_path: str, content: str) -> Dict[str, Any]:
+def collect_py_files(generated_files: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Select the Python files once, for sharing across validators.
+    
+    Args:
+        generated_files: Dictionary mapping file paths to file contents
+        
+    Returns:
+        Tuple of (file_path, content) pairs for the .py files. Paths are
+        interned, as are the validators' path constants.
+    """
+    return tuple(
+        (sys.intern(file_path), content)
+        for file_path, content in generated_files.items()
+        if file_path.endswith('.py')
+    )
+
+
+def build_ast_cache(py_files: Sequence[Tuple[str, str]]) -> Dict[str, ast.Module]:
+    """
+    Parse every Python file once, for sharing across validators.
+    
+    Args:
+        py_files: (file_path, content) pairs from collect_py_files
+        
+    Returns:
+        Dictionary mapping file paths to parsed modules. Files that fail to
+        parse are left out; validators re-parse those to report the error.
+    """
+    ast_cache = {}
+    for file_path, content in py_files:
+        try:
+            ast_cache[file_path] = ast.parse(content, filename=file_path)
+        except (SyntaxError, ValueError):
+            pass
+    return ast_cache
+
+
+def validate_python_syntax(file_path: str, content: str, tree: Optional[ast.Module] = None) -> Dict[str, Any]:
     """
     Validate Python syntax using AST parsing.
     
     Args:
         file_path: Path to the file being validated
         content: File content as string
+        tree: Already parsed module for content, if available
         
     Returns:
         Dictionary with 'valid' (bool) and 'errors' (list) keys
     """
     errors = []
     
-    # Skip non-Python files
-    if not file_path.endswith('.py'):
+    # Skip non-Python files, and files already known to parse
+    if not file_path.endswith('.py') or tree is not None:
         return {"valid": True, "errors": []}
     
     try:
@@ -46,12 +86,16 @@ def validate_python_syntax(file_path: str, content: str) -> Dict[str, Any]:
         return {"valid": False, "errors": errors}
 
 
-def validate_all_files(generated_files: Dict[str, str]) -> Dict[str, Any]:
+def validate_all_files(
+    py_files: Sequence[Tuple[str, str]],
+    ast_cache: Optional[Dict[str, ast.Module]] = None
+) -> Dict[str, Any]:
     """
-    Validate syntax for all Python files in generated_files.
+    Validate syntax for all Python files.
     
     Args:
-        generated_files: Dictionary mapping file paths to file contents
+        py_files: (file_path, content) pairs from collect_py_files
+        ast_cache: Parsed modules from build_ast_cache, if available
         
     Returns:
         Dictionary with overall validation results
@@ -64,16 +108,17 @@ def validate_all_files(generated_files: Dict[str, str]) -> Dict[str, Any]:
         "errors": []
     }
     
-    for file_path, content in generated_files.items():
-        if file_path.endswith('.py'):
-            results["total_files"] += 1
-            validation = validate_python_syntax(file_path, content)
-            if validation["valid"]:
-                results["valid_files"] += 1
-            else:
-                results["valid_files"] += 1  # Count as checked
-                results["invalid_files"] += 1
-                results["errors"].extend(validation["errors"])
-                results["valid"] = False
+    ast_cache = ast_cache or {}
+    
+    for file_path, content in py_files:
+        results["total_files"] += 1
+        validation = validate_python_syntax(file_path, content, tree=ast_cache.get(file_path))
+        if validation["valid"]:
+            results["valid_files"] += 1
+        else:
+            results["valid_files"] += 1  # Count as checked
+            results["invalid_files"] += 1
+            results["errors"].extend(validation["errors"])
+            results["valid"] = False
     
     return results
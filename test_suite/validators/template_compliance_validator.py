@@ -1,24 +1,109 @@
 """Template compliance validation against reference agent."""
 import ast
+import hashlib
 import re
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Any, Mapping, Optional, Set, Tuple
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Keys of the extract_key_patterns result, in the order of the cached tuples
+_PATTERN_KEYS = ("imports", "functions", "classes", "global_vars", "async_functions")
+_NO_PATTERNS: Tuple[Tuple[str, ...], ...] = tuple(() for _ in _PATTERN_KEYS)
+
+# Every extracted pattern contains one of these (global variables start with "_")
+_PATTERN_KEYWORDS = ("import", "def", "class", "_")
+
+# Pattern categories compared by calculate_similarity
+_SIMILARITY_KEYS = ("imports", "functions", "classes")
+
+# Imports each file must contain, as (name, lowercased name) pairs; they
+# match any generated import containing the name, ignoring case
+_CRITICAL_IMPORTS: Mapping[str, Tuple[Tuple[str, str], ...]] = MappingProxyType({
+    file_path: tuple((name, name.lower()) for name in names)
+    for file_path, names in {
+        "agent.py": ("google.adk", "Agent", "config", "tools"),
+        "tools/pipedream_tools.py": ("pipedream_client", "PipedreamMCPClient", "asyncio"),
+        "tools/pipedream_client.py": ("mcp", "ClientSession", "Pipedream"),
+    }.items()
+})
+
+# Functions each file must define (reported in this order when missing)
+_REQUIRED_FUNCTIONS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "agent.py": ("_get_model",),
+    "config/agent_config.py": ("get_agent_config",),
+    "tools/__init__.py": ("get_agent_tools",),
+    "tools/pipedream_tools.py": (
+        "initialize_pipedream_client",
+        "create_pipedream_tool_function",
+        "create_smart_pipedream_tool",
+        "create_list_pipedream_tools_tool",
+        "_init_tools_sync",
+    ),
+})
+
+# Global state variables tools/pipedream_tools.py should define
+_REQUIRED_GLOBALS: FrozenSet[str] = frozenset({
+    "_pipedream_client",
+    "_pipedream_tools",
+    "_pipedream_initialized",
+})
+
+# Rules compare_with_reference applies to each file, checked in this order
+_FILE_RULES: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "agent.py": {
+        "imports": _CRITICAL_IMPORTS["agent.py"],
+        "functions": _REQUIRED_FUNCTIONS["agent.py"],
+    },
+    "config/agent_config.py": {
+        "functions": _REQUIRED_FUNCTIONS["config/agent_config.py"],
+    },
+    "tools/__init__.py": {
+        "functions": _REQUIRED_FUNCTIONS["tools/__init__.py"],
+    },
+    "tools/pipedream_tools.py": {
+        "imports": _CRITICAL_IMPORTS["tools/pipedream_tools.py"],
+        "functions": _REQUIRED_FUNCTIONS["tools/pipedream_tools.py"],
+        "globals": _REQUIRED_GLOBALS,
+    },
+    "tools/pipedream_client.py": {
+        "imports": _CRITICAL_IMPORTS["tools/pipedream_client.py"],
+        "classes": ("PipedreamMCPClient",),
+    },
+})
+
+# On-disk cache of reference file patterns, shared across runs. Entries are
+# keyed by content hash; bump the version whenever the extracted patterns change.
+PATTERN_CACHE_PATH = Path.home() / ".cache" / "agent2" / "template_patterns.sqlite"
+_PATTERN_CACHE_VERSION = 2
+
 
 def load_reference_agent(reference_path: Path) -> Dict[str, str]:
     """
     Load reference agent files for comparison.
     
+    Files are read once per reference path and process; edits to the
+    reference agent are picked up on the next run.
+    
     Args:
         reference_path: Path to reference agent directory (my_agent)
         
     Returns:
         Dictionary mapping file paths to contents
     """
-    reference_files = {}
+    return dict(_load_reference_files(reference_path))
+
+
+@lru_cache(maxsize=4)
+def _load_reference_files(reference_path: Path) -> Tuple[Tuple[str, str], ...]:
+    """Read the reference files that exist, as (file path, content) pairs."""
+    reference_files = []
     
     files_to_load = [
         "agent.py",
@@ -29,79 +114,231 @@ def load_reference_agent(reference_path: Path) -> Dict[str, str]:
     ]
     
     for file_path in files_to_load:
-        full_path = reference_path / file_path
-        if full_path.exists():
-            reference_files[file_path] = full_path.read_text(encoding='utf-8')
+        try:
+            content = (reference_path / file_path).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        reference_files.append((file_path, content))
     
-    return reference_files
+    return tuple(reference_files)
 
 
-def extract_key_patterns(content: str) -> Dict[str, Any]:
+def extract_key_patterns(content: str, tree: Optional[ast.Module] = None) -> Dict[str, Any]:
     """
     Extract key patterns from code for comparison.
     
+    Without a tree, results are cached by content, so reference files and
+    repeated generated files are only parsed once.
+    
     Args:
         content: Python code content
+        tree: Already parsed module for content, if available (skips parsing)
         
     Returns:
         Dictionary with extracted patterns
     """
-    patterns = {
-        "imports": [],
-        "functions": [],
-        "classes": [],
-        "global_vars": [],
-        "async_functions": []
-    }
+    if tree is not None:
+        return _thaw_patterns(_patterns_from_tree(tree))
+    return _thaw_patterns(_extract_key_patterns_cached(content))
+
+
+def _thaw_patterns(frozen: Tuple[Tuple[str, ...], ...]) -> Dict[str, List[str]]:
+    """Convert cached pattern tuples to the dictionary returned by extract_key_patterns."""
+    return {key: list(values) for key, values in zip(_PATTERN_KEYS, frozen)}
+
+
+@lru_cache(maxsize=256)
+def _extract_key_patterns_cached(content: str) -> Tuple[Tuple[str, ...], ...]:
+    """Parse content and extract its patterns (none if it does not parse)."""
+    # Files that cannot contain any pattern (empty __init__.py files,
+    # comment-only modules) are not parsed at all
+    if not any(keyword in content for keyword in _PATTERN_KEYWORDS):
+        return _NO_PATTERNS
     
     try:
         tree = ast.parse(content)
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    patterns["imports"].append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                for alias in node.names:
-                    patterns["imports"].append(f"{module}.{alias.name}")
-            
-            elif isinstance(node, ast.FunctionDef):
-                patterns["functions"].append(node.name)
-                if any(isinstance(n, ast.AsyncFunctionDef) for n in [node]):
-                    # Check if it's async
-                    pass
-            elif isinstance(node, ast.AsyncFunctionDef):
-                patterns["async_functions"].append(node.name)
-                patterns["functions"].append(node.name)
-            
-            elif isinstance(node, ast.ClassDef):
-                patterns["classes"].append(node.name)
-            
-            elif isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        if target.id.startswith("_") and not target.id.startswith("__"):
-                            patterns["global_vars"].append(target.id)
-    
     except SyntaxError:
-        pass
+        return _NO_PATTERNS
+    return _patterns_from_tree(tree)
+
+
+def _patterns_from_tree(tree: ast.Module) -> Tuple[Tuple[str, ...], ...]:
+    """Extract the patterns of a module as immutable tuples, ordered as _PATTERN_KEYS."""
+    patterns = {key: [] for key in _PATTERN_KEYS}
+    _collect_imports(tree.body, patterns)
+    _collect_patterns(tree.body, patterns)
+    return tuple(tuple(patterns[key]) for key in _PATTERN_KEYS)
+
+
+def _collect_imports(statements: List[ast.stmt], patterns: Dict[str, List[str]]) -> None:
+    """
+    Collect every import, including imports inside functions and classes.
+    
+    Generated tools modules import lazily, so unlike the other patterns,
+    imports are not limited to module level.
+    """
+    for node in statements:
+        handler = _IMPORT_HANDLERS.get(type(node))
+        if handler is not None:
+            handler(node, patterns)
+        else:
+            for field in _BLOCK_FIELDS:
+                _collect_imports(getattr(node, field, ()), patterns)
+
+
+def _collect_patterns(statements: List[ast.stmt], patterns: Dict[str, List[str]]) -> None:
+    """
+    Collect the functions, classes and globals of module-level statements.
+    
+    Function and class bodies are never entered. Other compound statements
+    (if/try/with blocks) are, since they hold guarded definitions that are
+    still module-level. Imports are collected by _collect_imports.
+    """
+    for node in statements:
+        handler = _PATTERN_HANDLERS.get(type(node))
+        if handler is not None:
+            handler(node, patterns)
+        else:
+            for field in _BLOCK_FIELDS:
+                _collect_patterns(getattr(node, field, ()), patterns)
+
+
+def _add_import(node: ast.Import, patterns: Dict[str, List[str]]) -> None:
+    for alias in node.names:
+        patterns["imports"].append(alias.name)
+
+
+def _add_import_from(node: ast.ImportFrom, patterns: Dict[str, List[str]]) -> None:
+    module = node.module or ""
+    for alias in node.names:
+        patterns["imports"].append(f"{module}.{alias.name}")
+
+
+def _add_function(node: ast.FunctionDef, patterns: Dict[str, List[str]]) -> None:
+    patterns["functions"].append(node.name)
+
+
+def _add_async_function(node: ast.AsyncFunctionDef, patterns: Dict[str, List[str]]) -> None:
+    patterns["async_functions"].append(node.name)
+    patterns["functions"].append(node.name)
+
+
+def _add_class(node: ast.ClassDef, patterns: Dict[str, List[str]]) -> None:
+    patterns["classes"].append(node.name)
+
+
+def _add_global_var(target: ast.expr, patterns: Dict[str, List[str]]) -> None:
+    if isinstance(target, ast.Name):
+        if target.id.startswith("_") and not target.id.startswith("__"):
+            patterns["global_vars"].append(target.id)
+
+
+def _add_assign(node: ast.Assign, patterns: Dict[str, List[str]]) -> None:
+    for target in node.targets:
+        _add_global_var(target, patterns)
+
+
+def _add_ann_assign(node: ast.AnnAssign, patterns: Dict[str, List[str]]) -> None:
+    _add_global_var(node.target, patterns)
+
+
+# Statement fields holding nested statement lists
+_BLOCK_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+
+_IMPORT_HANDLERS = {
+    ast.Import: _add_import,
+    ast.ImportFrom: _add_import_from,
+}
+
+_PATTERN_HANDLERS = {
+    ast.FunctionDef: _add_function,
+    ast.AsyncFunctionDef: _add_async_function,
+    ast.ClassDef: _add_class,
+    ast.Assign: _add_assign,
+    ast.AnnAssign: _add_ann_assign,
+}
+
+
+@lru_cache(maxsize=64)
+def _reference_patterns_cached(content: str) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Extract the patterns of a reference file, using the on-disk cache.
+    
+    Reference files rarely change, so across runs their patterns are read
+    from PATTERN_CACHE_PATH instead of parsing them again.
+    """
+    key = hashlib.sha256(f"{_PATTERN_CACHE_VERSION}\0{content}".encode("utf-8")).hexdigest()
+    
+    frozen = _read_pattern_cache(key)
+    if frozen is None:
+        frozen = _extract_key_patterns_cached(content)
+        _write_pattern_cache(key, frozen)
+    return frozen
+
+
+def _connect_pattern_cache() -> sqlite3.Connection:
+    """Open the pattern cache database, creating it if needed."""
+    PATTERN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(PATTERN_CACHE_PATH, timeout=5)
+    conn.execute("CREATE TABLE IF NOT EXISTS patterns (sha TEXT PRIMARY KEY, patterns BLOB)")
+    return conn
+
+
+def _read_pattern_cache(key: str) -> Optional[Tuple[Tuple[str, ...], ...]]:
+    """Look up cached patterns (None on a miss or if the cache is unusable)."""
+    try:
+        with closing(_connect_pattern_cache()) as conn:
+            row = conn.execute("SELECT patterns FROM patterns WHERE sha = ?", (key,)).fetchone()
+    except (OSError, sqlite3.Error) as e:
+        logger.debug(f"Template pattern cache unavailable: {e}")
+        return None
+    
+    if row is None:
+        return None
     
-    return patterns
+    # A corrupt or unexpected entry is a miss; it is overwritten once re-extracted
+    try:
+        patterns = orjson.loads(row[0])
+    except orjson.JSONDecodeError as e:
+        logger.debug(f"Ignoring corrupt template pattern cache entry: {e}")
+        return None
+    if not isinstance(patterns, dict) or not all(
+        isinstance(names, list) and all(isinstance(name, str) for name in names)
+        for names in (patterns.get(pattern_key, []) for pattern_key in _PATTERN_KEYS)
+    ):
+        logger.debug("Ignoring malformed template pattern cache entry")
+        return None
+    return tuple(tuple(patterns.get(pattern_key, ())) for pattern_key in _PATTERN_KEYS)
+
+
+def _write_pattern_cache(key: str, frozen: Tuple[Tuple[str, ...], ...]) -> None:
+    """Store patterns in the cache (best effort)."""
+    try:
+        with closing(_connect_pattern_cache()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO patterns (sha, patterns) VALUES (?, ?)",
+                (key, orjson.dumps(dict(zip(_PATTERN_KEYS, frozen))))
+            )
+    except (OSError, sqlite3.Error) as e:
+        logger.debug(f"Could not write template pattern cache: {e}")
 
 
 def compare_with_reference(
     generated_content: str,
-    reference_content: str,
-    file_path: str
+    ref_patterns: Dict[str, Any],
+    file_path: str,
+    tree: Optional[ast.Module] = None,
+    ref_items: Optional[FrozenSet[Tuple[str, str]]] = None
 ) -> Dict[str, Any]:
     """
     Compare generated content with reference content.
     
     Args:
         generated_content: Generated file content
-        reference_content: Reference file content
+        ref_patterns: extract_key_patterns result for the reference file
         file_path: Path to the file being compared
+        tree: Already parsed module for generated_content, if available
+        ref_items: Similarity items of the reference file, if available
         
     Returns:
         Comparison results
@@ -109,113 +346,148 @@ def compare_with_reference(
     errors = []
     warnings = []
     
-    gen_patterns = extract_key_patterns(generated_content)
-    ref_patterns = extract_key_patterns(reference_content)
+    gen_patterns = extract_key_patterns(generated_content, tree=tree)
     
-    # Check for critical imports
-    critical_imports = {
-        "agent.py": ["google.adk", "Agent", "config", "tools"],
-        "tools/pipedream_tools.py": ["pipedream_client", "PipedreamMCPClient", "asyncio"],
-        "tools/pipedream_client.py": ["mcp", "ClientSession", "Pipedream"]
-    }
+    # Check the critical imports, required definitions and global state of this file
+    for rule, required in _FILE_RULES.get(file_path, {}).items():
+        _RULE_CHECKS[rule](gen_patterns, required, file_path, errors, warnings)
     
-    if file_path in critical_imports:
-        required = critical_imports[file_path]
-        for req_import in required:
-            found = False
-            for imp in gen_patterns["imports"]:
-                if req_import.lower() in imp.lower():
-                    found = True
-                    break
-            if not found:
-                errors.append({
-                    "type": "missing_critical_import",
-                    "message": f"Missing critical import related to '{req_import}'",
-                    "file": file_path
-                })
-    
-    # Check for required functions
-    required_functions = {
-        "agent.py": ["_get_model"],
-        "config/agent_config.py": ["get_agent_config"],
-        "tools/__init__.py": ["get_agent_tools"],
-        "tools/pipedream_tools.py": [
-            "initialize_pipedream_client",
-            "create_pipedream_tool_function",
-            "create_smart_pipedream_tool",
-            "create_list_pipedream_tools_tool",
-            "_init_tools_sync"
-        ]
+    return {
+        "valid": len(errors) == 0,
+        "errors": errors,
+        "warnings": warnings,
+        "similarity_score": calculate_similarity(gen_patterns, ref_patterns, ref_items=ref_items)
     }
-    
-    if file_path in required_functions:
-        for req_func in required_functions[file_path]:
-            if req_func not in gen_patterns["functions"]:
-                errors.append({
-                    "type": "missing_required_function",
-                    "message": f"Missing required function: {req_func}",
-                    "file": file_path
-                })
-    
-    # Check for required classes
-    if file_path == "tools/pipedream_client.py":
-        if "PipedreamMCPClient" not in gen_patterns["classes"]:
+
+
+def _check_imports(
+    gen_patterns: Dict[str, List[str]],
+    required: Tuple[Tuple[str, str], ...],
+    file_path: str,
+    errors: List[Dict[str, Any]],
+    warnings: List[Dict[str, Any]]
+) -> None:
+    """Report each critical import no generated import contains (case-insensitive)."""
+    # Imports match by case-insensitive substring ("Agent" matches
+    # "google.adk.agents.LlmAgent"). Joining the lowercased imports once
+    # turns each check into a single substring search; no import name
+    # contains a newline, so matches cannot span two imports.
+    lowered_imports = "\n".join(gen_patterns["imports"]).lower()
+    for req_import, lowered_import in required:
+        if lowered_import not in lowered_imports:
             errors.append({
-                "type": "missing_required_class",
-                "message": "Missing required class: PipedreamMCPClient",
+                "type": "missing_critical_import",
+                "message": f"Missing critical import related to '{req_import}'",
                 "file": file_path
             })
-    
-    # Check for global state variables in pipedream_tools.py
-    if file_path == "tools/pipedream_tools.py":
-        required_globals = ["_pipedream_client", "_pipedream_tools", "_pipedream_initialized"]
-        found_globals = [g for g in gen_patterns["global_vars"] if g in required_globals]
-        if len(found_globals) < len(required_globals):
-            missing = set(required_globals) - set(found_globals)
-            warnings.append({
-                "type": "missing_global_vars",
-                "message": f"Missing global variables: {', '.join(missing)}",
+
+
+def _check_functions(
+    gen_patterns: Dict[str, List[str]],
+    required: Tuple[str, ...],
+    file_path: str,
+    errors: List[Dict[str, Any]],
+    warnings: List[Dict[str, Any]]
+) -> None:
+    """Report each required function the generated file does not define."""
+    gen_functions = set(gen_patterns["functions"])
+    for req_func in required:
+        if req_func not in gen_functions:
+            errors.append({
+                "type": "missing_required_function",
+                "message": f"Missing required function: {req_func}",
                 "file": file_path
             })
-    
-    return {
-        "valid": len(errors) == 0,
-        "errors": errors,
-        "warnings": warnings,
-        "similarity_score": calculate_similarity(gen_patterns, ref_patterns)
-    }
 
 
-def calculate_similarity(gen_patterns: Dict, ref_patterns: Dict) -> float:
+def _check_classes(
+    gen_patterns: Dict[str, List[str]],
+    required: Tuple[str, ...],
+    file_path: str,
+    errors: List[Dict[str, Any]],
+    warnings: List[Dict[str, Any]]
+) -> None:
+    """Report each required class the generated file does not define."""
+    for req_class in required:
+        if req_class not in gen_patterns["classes"]:
+            errors.append({
+                "type": "missing_required_class",
+                "message": f"Missing required class: {req_class}",
+                "file": file_path
+            })
+
+
+def _check_globals(
+    gen_patterns: Dict[str, List[str]],
+    required: FrozenSet[str],
+    file_path: str,
+    errors: List[Dict[str, Any]],
+    warnings: List[Dict[str, Any]]
+) -> None:
+    """Warn about missing global state variables."""
+    missing = required.difference(gen_patterns["global_vars"])
+    if missing:
+        warnings.append({
+            "type": "missing_global_vars",
+            "message": f"Missing global variables: {', '.join(sorted(missing))}",
+            "file": file_path
+        })
+
+
+_RULE_CHECKS = {
+    "imports": _check_imports,
+    "functions": _check_functions,
+    "classes": _check_classes,
+    "globals": _check_globals,
+}
+
+
+def calculate_similarity(
+    gen_patterns: Dict,
+    ref_patterns: Dict,
+    ref_items: Optional[FrozenSet[Tuple[str, str]]] = None
+) -> float:
     """
     Calculate similarity score between generated and reference patterns.
     
+    The score is the Jaccard index of the imports, functions and classes of
+    both files, compared as one set of category-tagged names.
+    
     Args:
         gen_patterns: Generated patterns
         ref_patterns: Reference patterns
+        ref_items: Similarity items of ref_patterns, if already built
         
     Returns:
         Similarity score (0.0 to 1.0)
     """
-    total_items = 0
-    matching_items = 0
-    
-    for key in ["imports", "functions", "classes"]:
-        gen_set = set(gen_patterns.get(key, []))
-        ref_set = set(ref_patterns.get(key, []))
-        
-        total_items += len(ref_set)
-        matching_items += len(gen_set & ref_set)
-    
-    if total_items == 0:
+    if ref_items is None:
+        ref_items = _similarity_items(ref_patterns)
+    if not ref_items:
         return 1.0
+    gen_items = _similarity_items(gen_patterns)
     
-    return matching_items / total_items if total_items > 0 else 0.0
+    # |gen ∪ ref| = |gen| + |ref| - |gen ∩ ref|, so one intersection gives both
+    matching_items = len(gen_items & ref_items)
+    return matching_items / (len(gen_items) + len(ref_items) - matching_items)
+
+
+def _similarity_items(patterns: Dict) -> Set[Tuple[str, str]]:
+    """Collect the compared patterns as (category, name) pairs."""
+    return {(key, name) for key in _SIMILARITY_KEYS for name in patterns.get(key, [])}
+
+
+@lru_cache(maxsize=64)
+def _reference_similarity_items(content: str) -> FrozenSet[Tuple[str, str]]:
+    """Similarity items of a reference file, built once per content and shared across agents."""
+    return frozenset(_similarity_items(_thaw_patterns(_reference_patterns_cached(content))))
 
 
 def validate_template_compliance(
     generated_files: Dict[str, str],
-    reference_path: Path
+    reference_path: Path,
+    ast_cache: Optional[Dict[str, ast.Module]] = None,
+    fast_fail: bool = False
 ) -> Dict[str, Any]:
     """
     Validate that generated files comply with reference template.
@@ -223,6 +495,9 @@ def validate_template_compliance(
     Args:
         generated_files: Dictionary mapping file paths to contents
         reference_path: Path to reference agent directory
+        ast_cache: Parsed modules from build_ast_cache, if available
+        fast_fail: Stop at the first non-compliant file; the results then only
+            cover the files compared so far (for callers that just need "valid")
         
     Returns:
         Validation results
@@ -235,22 +510,35 @@ def validate_template_compliance(
     }
     
     reference_files = load_reference_agent(reference_path)
+    reference_patterns = {
+        file_path: _thaw_patterns(_reference_patterns_cached(content))
+        for file_path, content in reference_files.items()
+    }
+    reference_items = {
+        file_path: _reference_similarity_items(content)
+        for file_path, content in reference_files.items()
+    }
+    ast_cache = ast_cache or {}
     
     # Compare each file that exists in both
     for file_path in generated_files:
-        if file_path in reference_files:
+        if file_path in reference_patterns:
             comparison = compare_with_reference(
                 generated_files[file_path],
-                reference_files[file_path],
-                file_path
+                reference_patterns[file_path],
+                file_path,
+                tree=ast_cache.get(file_path),
+                ref_items=reference_items[file_path]
             )
             
-            if not comparison["valid"]:
-                results["valid"] = False
-            
             results["errors"].extend(comparison["errors"])
             results["warnings"].extend(comparison["warnings"])
             results["similarity_scores"][file_path] = comparison["similarity_score"]
+            
+            if not comparison["valid"]:
+                results["valid"] = False
+                if fast_fail:
+                    break
         elif file_path.endswith('.py') and file_path not in ["__init__.py"]:
             # Warn about files that should have reference
             results["warnings"].append({
@@ -0,0 +1 @@
+"""Shared utilities for Agent 2."""
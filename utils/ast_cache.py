@@ -0,0 +1,23 @@
+"""Memoized AST parsing for generated Python files."""
+import ast
+from functools import lru_cache
+
+
+@lru_cache(maxsize=64)
+def parse_py(content: str) -> ast.Module:
+    """
+    Parse Python source, caching the resulting tree by content.
+    
+    Several validation steps inspect the same generated file, so the tree is
+    built once and shared. Callers must treat the returned tree as read-only.
+    
+    Args:
+        content: Python source code
+        
+    Returns:
+        Parsed module
+        
+    Raises:
+        SyntaxError: If content is not valid Python (failures are not cached)
+    """
+    return ast.parse(content)